@@ -1,4 +1,4 @@
-from stock_tools import adjust_price_unit, KEY
+from stock_tools import adjust_price_unit, KEY, Order, submit_orders
 import mojito
 
 # ======================
@@ -46,3 +46,16 @@ sell_by_market_price_res = broker.create_market_sell_order(
     symbol="005930",
     quantity=1
 )
+
+# ===================
+# 여러 주문 한 번에 제출
+
+results = submit_orders(
+    broker,
+    [
+        Order(symbol="005930", side="buy", price=65_030, quantity=1),  # 가격은 호가 단위에 맞춰짐.
+        Order(symbol="035720", side="sell", price=43_060, quantity=2),
+    ],
+)
+for result in results:
+    print(result.order.symbol, result.price, result.is_success, f"{result.latency:.3f}s")
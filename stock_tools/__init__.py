@@ -5,14 +5,46 @@
 `from stocks.stock_statistics import ...`이나 `from stocks.fetch import ...`를 사용해서 불러오세요.
 """
 
-from .adjust_price import RangePlus, PRICE_UNITS, adjust_price_unit
+from .adjust_price import (
+    RangePlus,
+    PRICE_UNITS,
+    adjust_price_unit,
+    adjust_price_units,
+    price_to_tick,
+    tick_to_price,
+    tick_distance,
+    shift_ticks,
+    price_ladder,
+)
+from .backtest_result import BacktestResult
+from .backtest_server import BacktestServer, BacktestClient
+from .checkpoint import EmulationCheckpoint
 from .emulate_trade import emulate_trade
 from .key import KEY, OTHER_ENV
 from .monkey_investor import monkey_investor
+from .order_batch import Order, OrderResult, submit_orders
+from .parameter_sweep import sweep_emulate_trade
 from .price_cache import MAX_DATE_LIMIT, PriceCache
+from .price_matrix import PriceMatrix
+from .profiling import Profiler, ProfileReport
+from .quote_cache import QuoteCache
+from .rate_limit import (
+    RateLimiter,
+    RequestScheduler,
+    SchedulerMetrics,
+    Priority,
+    DEFAULT_RATE_LIMITER,
+    DEFAULT_SCHEDULER,
+)
+from .result_cache import EmulationResultCache
+from .screening import screen_universe
+from .signals import compile_signals
+from .triggers import Trigger, StopLoss, TakeProfit, TrailingStop, TimeStop
 from .transaction_and_state import (
     SIGNIFICANT_PRICE_NAMES,
     Transaction,
+    TransactionBatch,
     State,
     INITIAL_STATE,
+    merge_transaction_streams,
 )
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 import logging
-from typing import Iterator, Literal, Generic, TypeVar
+from typing import Iterator, Literal, Generic, TypeVar, overload
 from dataclasses import dataclass
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
+
+import numpy as np
 
 
 Start = TypeVar("Start", int, None)
@@ -174,3 +176,141 @@ def adjust_price_unit(
             f"Price has been adjusted from {price} to {adjusted_price}({mode} mode)."
         )
     return adjusted_price
+
+
+def adjust_price_units(
+    prices: Sequence[int] | np.ndarray,
+    mode: Literal["round", "floor", "ceil"] = "round",
+) -> np.ndarray:
+    """adjust_price_unit과 같지만 여러 가격을 numpy 배열로 한 번에 호가 단위에 맞춥니다.
+
+    adjust_price_unit과 결과가 같으며, error와 alert는 지원하지 않습니다.
+
+    Raises:
+        TypeError: 적절한 mode가 오지 않는다면 발생합니다.
+        ValueError: 호가 단위가 정의되지 않은 가격(1원 미만)이 있다면 발생합니다.
+    """
+    prices = np.asarray(prices, dtype=np.int64)
+    unit_starts, unit_steps, _ = _get_price_unit_arrays()
+
+    units = np.searchsorted(unit_starts, prices, side="right") - 1
+    if (units < 0).any():
+        raise ValueError(
+            f"There's no matched price unit for price(s) {prices[units < 0]}."
+        )
+    starts = unit_starts[units]
+    steps = unit_steps[units]
+
+    diffs = (prices - starts) % steps
+    if mode == "round":
+        return np.where(steps / 2 <= diffs, prices - diffs + steps, prices - diffs)
+    if mode == "floor":
+        return prices - diffs
+    if mode == "ceil":
+        return np.where(diffs == 0, prices, prices - diffs + steps)
+    raise TypeError(f"Unknown mode '{mode}'.")
+
+
+def _get_price_unit_arrays() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """PRICE_UNITS의 구간별 시작 가격, 호가 단위, 구간의 첫 호가의 tick index를 배열로 반환합니다."""
+    unit_starts = np.array([price_unit.start for price_unit in PRICE_UNITS])
+    unit_steps = np.array([price_unit.step for price_unit in PRICE_UNITS])
+    # 마지막 구간은 끝이 없으므로 마지막 구간의 tick 수는 사용되지 않음.
+    tick_counts = (np.diff(unit_starts)) // unit_steps[:-1]
+    unit_first_ticks = np.concatenate(([0], np.cumsum(tick_counts)))
+    return unit_starts, unit_steps, unit_first_ticks
+
+
+@overload
+def price_to_tick(
+    prices: int, mode: Literal["round", "floor", "ceil"] = "round"
+) -> int:
+    ...
+
+
+@overload
+def price_to_tick(
+    prices: Sequence[int] | np.ndarray,
+    mode: Literal["round", "floor", "ceil"] = "round",
+) -> np.ndarray:
+    ...
+
+
+def price_to_tick(
+    prices: int | Sequence[int] | np.ndarray,
+    mode: Literal["round", "floor", "ceil"] = "round",
+) -> int | np.ndarray:
+    """가격을 모든 PRICE_UNITS 구간에 걸친 tick index로 바꿉니다. 가장 낮은 호가(1원)의 tick index는 0입니다.
+
+    호가 단위에 맞지 않는 가격은 먼저 mode에 따라 호가 단위에 맞춥니다.
+    구간마다 한 번의 계산으로 끝나기 때문에 가격 수와 상관없이 가격 하나당 O(1)입니다.
+    """
+    adjusted_prices = adjust_price_units(np.atleast_1d(prices), mode)
+    unit_starts, unit_steps, unit_first_ticks = _get_price_unit_arrays()
+    units = np.searchsorted(unit_starts, adjusted_prices, side="right") - 1
+    ticks = (
+        unit_first_ticks[units]
+        + (adjusted_prices - unit_starts[units]) // unit_steps[units]
+    )
+    return int(ticks[0]) if np.ndim(prices) == 0 else ticks
+
+
+@overload
+def tick_to_price(ticks: int) -> int:
+    ...
+
+
+@overload
+def tick_to_price(ticks: Sequence[int] | np.ndarray) -> np.ndarray:
+    ...
+
+
+def tick_to_price(ticks: int | Sequence[int] | np.ndarray) -> int | np.ndarray:
+    """price_to_tick의 역함수로, tick index를 가격으로 바꿉니다."""
+    ticks_array = np.atleast_1d(np.asarray(ticks, dtype=np.int64))
+    if (ticks_array < 0).any():
+        raise ValueError(
+            f"Tick index cannot be negative: {ticks_array[ticks_array < 0]}"
+        )
+
+    unit_starts, unit_steps, unit_first_ticks = _get_price_unit_arrays()
+    units = np.searchsorted(unit_first_ticks, ticks_array, side="right") - 1
+    prices = (
+        unit_starts[units] + (ticks_array - unit_first_ticks[units]) * unit_steps[units]
+    )
+    return int(prices[0]) if np.ndim(ticks) == 0 else prices
+
+
+def tick_distance(
+    from_prices: int | Sequence[int] | np.ndarray,
+    to_prices: int | Sequence[int] | np.ndarray,
+    mode: Literal["round", "floor", "ceil"] = "round",
+) -> int | np.ndarray:
+    """from_prices에서 to_prices까지 몇 호가 떨어져 있는지 계산합니다. to_prices가 더 낮다면 음수입니다."""
+    return price_to_tick(to_prices, mode) - price_to_tick(from_prices, mode)
+
+
+def shift_ticks(
+    prices: int | Sequence[int] | np.ndarray,
+    ticks: int | Sequence[int] | np.ndarray,
+    mode: Literal["round", "floor", "ceil"] = "round",
+) -> int | np.ndarray:
+    """prices에서 ticks 호가만큼 위(ticks가 음수라면 아래)의 가격을 구합니다.
+
+    예를 들어 `shift_ticks(1999, 2)`는 구간이 바뀌는 것을 고려해 2005가 됩니다.
+    """
+    return tick_to_price(price_to_tick(prices, mode) + np.asarray(ticks))
+
+
+def price_ladder(low: int, high: int, tick_step: int = 1) -> np.ndarray:
+    """low 이상 high 이하의 모든 호가를 tick_step 호가 간격으로 낮은 가격부터 반환합니다.
+
+    low는 호가 단위에 맞춰 올림, high는 내림되며, 그리드나 분할 매매 주문의 가격을 한 번에 만들 때 사용할 수 있습니다.
+    """
+    if tick_step <= 0:
+        raise ValueError("`tick_step` should be positive.")
+    return tick_to_price(
+        np.arange(
+            price_to_tick(low, "ceil"), price_to_tick(high, "floor") + 1, tick_step
+        )
+    )
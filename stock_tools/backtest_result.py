@@ -0,0 +1,194 @@
+from __future__ import annotations
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from os import PathLike
+from typing import overload
+
+import numpy as np
+import pandas as pd
+
+from .transaction_and_state import State, Transaction
+
+
+@dataclass(eq=False)
+class BacktestResult(Sequence[State]):
+    """emulate_trade의 결과를 State의 list 대신 열(column)별 numpy 배열로 저장하는 클래스입니다.
+
+    State의 Sequence처럼 사용할 수 있으며, 이때 State는 접근할 때마다 배열에서 새로 만들어집니다.
+    to_numpy와 to_pandas는 배열을 복사하지 않고, save와 load로 npz 파일에 저장하고 불러올 수 있습니다.
+
+    counts와 prices의 모양은 (State 수 × 종목 수)이고, 열의 순서는 company_codes를 따릅니다.
+    보유하지 않은 종목의 count는 0입니다.
+    transaction이 없는 State의 transaction_company_codes는 빈 문자열입니다.
+    """
+
+    dates: np.ndarray
+    total_appraisements: np.ndarray
+    budgets: np.ndarray
+    company_codes: list[str]
+    counts: np.ndarray
+    prices: np.ndarray
+    transaction_company_codes: np.ndarray
+    transaction_amounts: np.ndarray
+    transaction_sell_prices: np.ndarray
+
+    @classmethod
+    def from_states(cls, states: Sequence[State]) -> BacktestResult:
+        """State들로부터 BacktestResult를 만듭니다. transaction의 sell_price는 미리 계산되어 있어야 합니다."""
+        company_codes = list(
+            dict.fromkeys(
+                company_code for state in states for company_code in state.stocks
+            )
+        )
+        columns = {
+            company_code: column for column, company_code in enumerate(company_codes)
+        }
+
+        counts = np.zeros((len(states), len(company_codes)), dtype=np.int64)
+        prices = np.zeros((len(states), len(company_codes)), dtype=np.int64)
+        for row, state in enumerate(states):
+            for company_code, (count, price) in state.stocks.items():
+                counts[row, columns[company_code]] = count
+                prices[row, columns[company_code]] = price
+
+        transactions = [state.transaction for state in states]
+        return cls(
+            np.array([state.date for state in states], dtype="datetime64[ns]"),
+            np.array([state.total_appraisement for state in states], dtype=np.int64),
+            np.array([state.budget for state in states], dtype=np.int64),
+            company_codes,
+            counts,
+            prices,
+            np.array(
+                [
+                    "" if transaction is None else transaction.company_code
+                    for transaction in transactions
+                ],
+                dtype=str,
+            ),
+            np.array(
+                [
+                    0 if transaction is None else transaction.amount
+                    for transaction in transactions
+                ],
+                dtype=np.int64,
+            ),
+            np.array(
+                [
+                    0 if transaction is None else int(transaction.sell_price)
+                    for transaction in transactions
+                ],
+                dtype=np.int64,
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @overload
+    def __getitem__(self, index: int) -> State:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> BacktestResult:
+        ...
+
+    def __getitem__(self, index: int | slice) -> State | BacktestResult:
+        if isinstance(index, slice):
+            return BacktestResult(
+                self.dates[index],
+                self.total_appraisements[index],
+                self.budgets[index],
+                self.company_codes,
+                self.counts[index],
+                self.prices[index],
+                self.transaction_company_codes[index],
+                self.transaction_amounts[index],
+                self.transaction_sell_prices[index],
+            )
+
+        date: datetime = pd.Timestamp(self.dates[index]).to_pydatetime()
+        stocks = {
+            self.company_codes[column]: (
+                int(self.counts[index, column]),
+                int(self.prices[index, column]),
+            )
+            for column in np.flatnonzero(self.counts[index])
+        }
+        transaction_company_code = str(self.transaction_company_codes[index])
+        transaction = (
+            Transaction(
+                date,
+                transaction_company_code,
+                int(self.transaction_amounts[index]),
+                int(self.transaction_sell_prices[index]),
+            )
+            if transaction_company_code
+            else None
+        )
+        return State(
+            date,
+            int(self.total_appraisements[index]),
+            int(self.budgets[index]),
+            stocks,
+            transaction,
+        )
+
+    def to_numpy(self) -> dict[str, np.ndarray]:
+        """저장된 배열들을 복사하지 않고 반환합니다."""
+        return {
+            "date": self.dates,
+            "total_appraisement": self.total_appraisements,
+            "budget": self.budgets,
+            "counts": self.counts,
+            "prices": self.prices,
+        }
+
+    def to_pandas(self, include_counts: bool = False) -> pd.DataFrame:
+        """date, total_appraisement, budget 열을 가진 DataFrame을 배열을 복사하지 않고 만듭니다.
+
+        include_counts가 True라면 종목 코드별 보유 수량 열도 포함합니다.
+        """
+        columns = {
+            "date": self.dates,
+            "total_appraisement": self.total_appraisements,
+            "budget": self.budgets,
+        }
+        if include_counts:
+            columns |= {
+                company_code: self.counts[:, column]
+                for column, company_code in enumerate(self.company_codes)
+            }
+        return pd.DataFrame(columns, copy=False)
+
+    def save(self, file: str | PathLike) -> None:
+        """결과를 압축된 npz 파일로 저장합니다. pickle을 사용하지 않습니다."""
+        np.savez_compressed(
+            file,
+            dates=self.dates,
+            total_appraisements=self.total_appraisements,
+            budgets=self.budgets,
+            company_codes=np.array(self.company_codes, dtype=str),
+            counts=self.counts,
+            prices=self.prices,
+            transaction_company_codes=self.transaction_company_codes,
+            transaction_amounts=self.transaction_amounts,
+            transaction_sell_prices=self.transaction_sell_prices,
+        )
+
+    @classmethod
+    def load(cls, file: str | PathLike) -> BacktestResult:
+        """save로 저장한 파일을 불러옵니다."""
+        with np.load(file) as data:
+            return cls(
+                data["dates"],
+                data["total_appraisements"],
+                data["budgets"],
+                data["company_codes"].tolist(),
+                data["counts"],
+                data["prices"],
+                data["transaction_company_codes"],
+                data["transaction_amounts"],
+                data["transaction_sell_prices"],
+            )
@@ -0,0 +1,322 @@
+"""PriceCache를 메모리에 올려 둔 채로 emulate_trade, monkey_investor, 가격 조회 요청을 처리하는 로컬 서버입니다.
+
+스크립트마다 PriceCache를 만들면 매번 캐시 파일을 불러와야 하지만,
+서버를 한 번 실행해 두면 BacktestClient는 이미 메모리에 있는 캐시로 바로 결과를 받을 수 있습니다.
+
+서버는 다음과 같이 실행할 수 있습니다.
+
+    python -m stock_tools.backtest_server
+
+요청과 결과는 multiprocessing.connection으로 주고받으며 pickle로 직렬화됩니다.
+pickle은 임의의 코드를 실행할 수 있으므로 항상 authkey로 인증된 client의 요청만 받습니다.
+authkey를 지정하지 않으면 서버와 client 모두 DEFAULT_AUTHKEY_PATH에 저장된 authkey를 사용하며,
+파일이 없다면 서버가 임의의 authkey를 만들어 소유자만 읽을 수 있는 파일(0600)로 저장합니다.
+기본 주소는 Unix socket(지원하지 않는 OS에서는 localhost)이므로 같은 컴퓨터에서만 접근할 수 있습니다.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from os import PathLike
+from pathlib import Path
+from typing import Any, Literal
+import logging
+import os
+import secrets
+import socket
+import threading
+
+import pandas as pd
+
+from .emulate_trade import emulate_trade
+from .fetch import PriceDict
+from .monkey_investor import monkey_investor
+from .price_cache import PriceCache
+from .transaction_and_state import State, Transaction, TransactionBatch
+
+DEFAULT_ADDRESS: str | tuple[str, int] = (
+    str(PriceCache.cache_directory / "backtest_server.sock")
+    if hasattr(socket, "AF_UNIX")
+    else ("localhost", 6006)
+)
+DEFAULT_AUTHKEY_PATH = PriceCache.cache_directory / "backtest_server.key"
+# 서버가 닫혔는지 확인하는 간격(초)
+_POLL_INTERVAL = 0.5
+
+
+class BacktestServer:
+    """하나의 PriceCache를 공유하며 여러 BacktestClient의 요청을 thread pool에서 동시에 처리합니다.
+
+    연결마다 하나의 worker가 배정되며, max_workers보다 많은 client가 연결되면 앞선 연결이 끝날 때까지 기다립니다.
+    worker들은 PriceCache의 lock으로 캐시를 바꾸는 작업을 한 번에 하나씩 처리합니다.
+    여러 worker가 동시에 캐시 파일에 쓰지 않도록 서버가 실행되는 동안 price_cache는 캐시 파일에 저장하지 않고,
+    close할 때 한 번만 저장합니다.
+    """
+
+    def __init__(
+        self,
+        price_cache: PriceCache,
+        address: str | tuple[str, int] = DEFAULT_ADDRESS,
+        authkey: bytes | None = None,
+        max_workers: int = 4,
+    ) -> None:
+        """같은 authkey를 사용하는 client만 연결할 수 있습니다. authkey가 None이라면 load_authkey(create=True)를 사용합니다."""
+        self.price_cache = price_cache
+        self.address = address
+        self.authkey = _check_authkey(
+            load_authkey(create=True) if authkey is None else authkey
+        )
+        self._store_cache_on_close = price_cache.cache_prices
+        self.price_cache.cache_prices = False
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._listener: Listener | None = None
+        self._serving_thread: threading.Thread | None = None
+        self._is_closed = threading.Event()
+
+    def serve_forever(self) -> None:
+        """close가 호출되거나 client가 shutdown을 요청할 때까지 요청을 처리합니다."""
+        if isinstance(self.address, str):
+            # 이전에 비정상적으로 종료된 서버의 socket 파일이 남아 있을 수 있음.
+            Path(self.address).parent.mkdir(parents=True, exist_ok=True)
+            Path(self.address).unlink(missing_ok=True)
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self._serving_thread = threading.current_thread()
+        logging.info(f"Backtest server is listening on {self.address}.")
+        try:
+            while not self._is_closed.is_set():
+                try:
+                    connection = self._listener.accept()
+                except AuthenticationError:
+                    logging.warning("Rejected a client with wrong authkey.")
+                    continue
+                if self._is_closed.is_set():
+                    connection.close()
+                    break
+                self._executor.submit(self._serve_connection, connection)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._is_closed.is_set():
+            return
+        self._is_closed.set()
+        if self._listener is not None:
+            if threading.current_thread() is not self._serving_thread:
+                # 다른 thread에서 기다리고 있는 accept는 listener를 닫아도 끝나지 않기 때문에 직접 연결해 깨움.
+                Client(self.address, authkey=self.authkey).close()
+            self._listener.close()
+        # 각 연결은 _is_closed를 주기적으로 확인하기 때문에 진행 중인 작업이 끝나면 종료됨.
+        self._executor.shutdown()
+        if self._store_cache_on_close:
+            self.price_cache._control_cache_file("store")
+
+    def __enter__(self) -> BacktestServer:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _serve_connection(self, connection: Connection) -> None:
+        with connection:
+            while not self._is_closed.is_set():
+                try:
+                    if not connection.poll(_POLL_INTERVAL):
+                        continue
+                    job, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                if job == "shutdown":
+                    connection.send(("ok", None))
+                    # serve_forever의 accept를 깨우기 위해 다른 thread에서 닫음.
+                    threading.Thread(target=self.close).start()
+                    return
+
+                try:
+                    result = self._run_job(job, kwargs)
+                except Exception as e:  # 어떤 예외든 client에게 그대로 전달함.
+                    connection.send(("error", e))
+                else:
+                    connection.send(("ok", result))
+
+    def _run_job(self, job: str, kwargs: dict[str, Any]) -> Any:
+        match job:
+            case "ping":
+                return "pong"
+            case "emulate_trade":
+                return emulate_trade(self.price_cache, **kwargs)
+            case "monkey_investor":
+                emulate_trade_kwargs = kwargs.pop("emulate_trade_kwargs", {})
+                return emulate_trade(
+                    *monkey_investor(self.price_cache, **kwargs),
+                    **emulate_trade_kwargs,
+                )
+            case "get_price":
+                return self.price_cache.get_price(**kwargs)
+            case "get_prices_between_range":
+                return self.price_cache.get_prices_between_range(**kwargs)
+            case "get_prices":
+                return self.price_cache.get_prices(**kwargs)
+            case _:
+                raise ValueError(f"Unknown job '{job}'.")
+
+
+class BacktestClient:
+    """BacktestServer에 요청을 보내는 client입니다. 메서드의 인자는 price_cache를 제외하면 원래 함수와 같습니다."""
+
+    def __init__(
+        self,
+        address: str | tuple[str, int] = DEFAULT_ADDRESS,
+        authkey: bytes | None = None,
+    ) -> None:
+        """authkey가 None이라면 서버가 저장한 authkey(load_authkey())를 사용합니다."""
+        self._connection = Client(
+            address,
+            authkey=_check_authkey(load_authkey() if authkey is None else authkey),
+        )
+        self._lock = threading.Lock()
+
+    def _request(self, job: str, **kwargs) -> Any:
+        with self._lock:
+            self._connection.send((job, kwargs))
+            status, result = self._connection.recv()
+        if status == "error":
+            raise result
+        return result
+
+    def ping(self) -> str:
+        return self._request("ping")
+
+    def emulate_trade(
+        self,
+        transactions: list[Transaction] | pd.DataFrame | TransactionBatch,
+        initial_state: State | None = None,
+        final_date: datetime | None = None,
+        **kwargs,
+    ) -> list[State] | tuple[list[State], list[tuple[datetime, float]], pd.DataFrame]:
+        return self._request(
+            "emulate_trade",
+            transactions=transactions,
+            initial_state=initial_state,
+            final_date=final_date,
+            **kwargs,
+        )
+
+    def monkey_investor(
+        self,
+        company_code: str,
+        start_day: datetime,
+        end_day: datetime,
+        invest_amount: tuple[float, float],
+        total_invest_count: int,
+        seed: int | None = None,
+        **emulate_trade_kwargs,
+    ) -> list[State] | tuple[list[State], list[tuple[datetime, float]], pd.DataFrame]:
+        """monkey_investor의 결과로 emulate_trade를 실행한 결과를 반환합니다. emulate_trade_kwargs는 emulate_trade에 전달됩니다."""
+        return self._request(
+            "monkey_investor",
+            company_code=company_code,
+            start_day=start_day,
+            end_day=end_day,
+            invest_amount=invest_amount,
+            total_invest_count=total_invest_count,
+            seed=seed,
+            emulate_trade_kwargs=emulate_trade_kwargs,
+        )
+
+    def get_price(
+        self,
+        day: datetime,
+        company_code: str | None = None,
+        nearest_day_threshold: int | None = 0,
+        date_direction: Literal["past", "future", "both"] = "both",
+    ) -> PriceDict:
+        return self._request(
+            "get_price",
+            day=day,
+            company_code=company_code,
+            nearest_day_threshold=nearest_day_threshold,
+            date_direction=date_direction,
+        )
+
+    def get_prices_between_range(
+        self, start_day: datetime, end_day: datetime, company_code: str | None = None
+    ) -> pd.DataFrame:
+        return self._request(
+            "get_prices_between_range",
+            start_day=start_day,
+            end_day=end_day,
+            company_code=company_code,
+        )
+
+    def get_prices(
+        self,
+        start_day: datetime,
+        end_day: datetime,
+        company_code: str | None = None,
+        date_type: Literal["D", "W", "M"] | int = "D",
+    ) -> pd.DataFrame:
+        return self._request(
+            "get_prices",
+            start_day=start_day,
+            end_day=end_day,
+            company_code=company_code,
+            date_type=date_type,
+        )
+
+    def shutdown_server(self) -> None:
+        """서버를 종료합니다. 서버는 캐시를 저장한 후 종료됩니다."""
+        self._request("shutdown")
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> BacktestClient:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def load_authkey(
+    path: str | PathLike = DEFAULT_AUTHKEY_PATH, create: bool = False
+) -> bytes:
+    """path에 저장된 authkey를 읽습니다.
+
+    create가 True이고 파일이 없다면 임의의 authkey를 만들어 소유자만 읽고 쓸 수 있는 파일(0600)로 저장합니다.
+    """
+    path = Path(path)
+    if create and not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            file_descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # 다른 서버가 먼저 만든 경우
+            pass
+        else:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(secrets.token_bytes(32))
+    try:
+        return path.read_bytes()
+    except FileNotFoundError as e:
+        raise FileNotFoundError(
+            f"There's no authkey file at {path}. Run the backtest server first or pass `authkey`."
+        ) from e
+
+
+def _check_authkey(authkey: bytes) -> bytes:
+    if not authkey:
+        raise ValueError("`authkey` should not be empty.")
+    return authkey
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with BacktestServer(PriceCache.from_keys_json()) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,45 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from os import PathLike
+from pathlib import Path
+import pickle
+
+from .transaction_and_state import State
+
+
+@dataclass
+class EmulationCheckpoint:
+    """emulate_trade가 끝난 시점의 상태를 저장해 다음에 그 다음 날부터 이어서 계산할 수 있도록 합니다.
+
+    비어 있는 EmulationCheckpoint를 emulate_trade의 checkpoint에 넘겨주면 끝날 때 상태가 저장되고,
+    같은 checkpoint를 다시 넘겨주면 last_date의 다음 날부터 새로운 transaction과 날짜만 계산합니다.
+    save와 load로 파일에 저장하고 불러올 수 있습니다.
+
+    Attributes:
+        last_date: 마지막으로 계산한 날짜입니다.
+        last_state: 마지막 State입니다. 이어서 계산할 때 initial_state로 사용됩니다.
+        state_after_last_transaction: 마지막 거래 직후의 State로, panic sell과 triggers의 기준이 됩니다.
+        pending_transaction_rows: final_date 이후라 아직 처리되지 않은 transaction들입니다.
+        last_appraisement_diff_rate: 마지막 날의 수익률(Rs의 마지막 값)입니다.
+    """
+
+    last_date: datetime | None = None
+    last_state: State | None = None
+    state_after_last_transaction: State | None = None
+    pending_transaction_rows: list[tuple] = field(default_factory=list)
+    last_appraisement_diff_rate: float = 0.0
+
+    @property
+    def is_empty(self) -> bool:
+        return self.last_state is None
+
+    def save(self, file: str | PathLike) -> None:
+        Path(file).write_bytes(pickle.dumps(self))
+
+    @classmethod
+    def load(cls, file: str | PathLike) -> EmulationCheckpoint:
+        checkpoint = pickle.loads(Path(file).read_bytes())
+        if not isinstance(checkpoint, cls):
+            raise TypeError(f"{file} is not a file saved by {cls.__name__}.save.")
+        return checkpoint
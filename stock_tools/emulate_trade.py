@@ -1,27 +1,46 @@
 from __future__ import annotations
+from collections.abc import Iterable, Mapping
 from datetime import datetime, timedelta
-from dataclasses import asdict
+from dataclasses import asdict, astuple, fields
 from typing import overload
+import heapq
 
+import numpy as np
 import pandas as pd
 
+from .checkpoint import EmulationCheckpoint
 from .price_cache import PriceCache
+from .price_matrix import PriceMatrix
+from .profiling import DISABLED_PROFILER, Profiler, use_profiler
+from .result_cache import EmulationResultCache
+from .triggers import Trigger, find_first_breach
 from .transaction_and_state import (
     Transaction,
+    TransactionBatch,
     State,
     INITIAL_STATE,
+    merge_transaction_streams,
 )
 
 
 @overload
 def emulate_trade(
     price_cache: PriceCache,
-    transactions: list[Transaction] | pd.DataFrame,
+    transactions: list[Transaction]
+    | pd.DataFrame
+    | TransactionBatch
+    | Mapping[str, Iterable[Transaction]],
     initial_state: State | None = None,
     final_date: datetime | None = None,
     only_if_transaction_exists: bool = False,
     commission: tuple[float, float] | None = None,
     panic_sell_rate: None = ...,
+    use_price_matrix: bool = True,
+    triggers: list[Trigger] | None = None,
+    profiler: Profiler | None = None,
+    checkpoint: EmulationCheckpoint | None = None,
+    result_cache: EmulationResultCache | None = None,
+    attribute_strategies: bool = False,
 ) -> list[State]:
     ...
 
@@ -29,12 +48,21 @@ def emulate_trade(
 @overload
 def emulate_trade(
     price_cache: PriceCache,
-    transactions: list[Transaction] | pd.DataFrame,
+    transactions: list[Transaction]
+    | pd.DataFrame
+    | TransactionBatch
+    | Mapping[str, Iterable[Transaction]],
     initial_state: State | None = None,
     final_date: datetime | None = None,
     only_if_transaction_exists: bool = False,
     commission: tuple[float, float] | None = None,
     panic_sell_rate: float = ...,
+    use_price_matrix: bool = True,
+    triggers: list[Trigger] | None = None,
+    profiler: Profiler | None = None,
+    checkpoint: EmulationCheckpoint | None = None,
+    result_cache: EmulationResultCache | None = None,
+    attribute_strategies: bool = False,
 ) -> tuple[list[State], list[tuple[datetime, float]], pd.DataFrame]:
     ...
 
@@ -42,30 +70,51 @@ def emulate_trade(
 @overload
 def emulate_trade(
     price_cache: PriceCache,
-    transactions: list[Transaction] | pd.DataFrame,
+    transactions: list[Transaction]
+    | pd.DataFrame
+    | TransactionBatch
+    | Mapping[str, Iterable[Transaction]],
     initial_state: State | None = None,
     final_date: datetime | None = None,
     only_if_transaction_exists: bool = False,
     commission: tuple[float, float] | None = None,
     panic_sell_rate: float | None = None,
+    use_price_matrix: bool = True,
+    triggers: list[Trigger] | None = None,
+    profiler: Profiler | None = None,
+    checkpoint: EmulationCheckpoint | None = None,
+    result_cache: EmulationResultCache | None = None,
+    attribute_strategies: bool = False,
 ) -> list[State] | tuple[list[State], list[tuple[datetime, float]], pd.DataFrame]:
     ...
 
 
 def emulate_trade(
     price_cache: PriceCache,
-    transactions: list[Transaction] | pd.DataFrame,
+    transactions: list[Transaction]
+    | pd.DataFrame
+    | TransactionBatch
+    | Mapping[str, Iterable[Transaction]],
     initial_state: State | None = None,
     final_date: datetime | None = None,
     only_if_transaction_exists: bool = False,
     commission: tuple[float, float] | None = None,
     panic_sell_rate: float | None = None,
+    use_price_matrix: bool = True,
+    triggers: list[Trigger] | None = None,
+    profiler: Profiler | None = None,
+    checkpoint: EmulationCheckpoint | None = None,
+    result_cache: EmulationResultCache | None = None,
+    attribute_strategies: bool = False,
 ) -> list[State] | tuple[list[State], list[tuple[datetime, float]], pd.DataFrame]:
     """거래를 모사해 거래의 결과와 진행 상황을 확인합니다. transactions와 관련한 설명은 Transaction dataclass를 확인하세요.
 
     Args:
         price_cache: PriceCache 인스턴스를 입력으로 받습니다.
-        transactions: transaction들을 입력으로 받습니다. 혹은 그 값을 Dataframe에 돌린 값도 가능합니다.
+        transactions: transaction들을 입력으로 받습니다. 혹은 그 값을 Dataframe에 돌린 값이나 TransactionBatch도 가능합니다.
+            TransactionBatch라면 모든 sell_price를 시작 전에 한 번에 계산하고 검사합니다.
+            전략 이름과 그 전략의 transaction들(list나 generator 등)의 dict를 넘기면 merge_transaction_streams로
+            하나로 합쳐 한 포트폴리오로 계산합니다. 각 전략의 transaction들은 날짜 순서대로 정렬되어 있어야 합니다.
             주의: 거래는 반드시 시간 순서대로 정렬되어 있어야 합니다.
         initial_state: 초기 상태를 정합니다. 이것으로 기존에 가지고 있던 주식이나 예산 등도 정의할 수 있습니다.
         only_if_transaction: 이 값이 False라면(기본값) transaction이 없는 날도 계산합니다.
@@ -76,37 +125,218 @@ def emulate_trade(
             `(1000 - 700) / 1000 >= 0.3`가 True이기 때문에 무조건 팝니다(panic sell).
             값이 0과 1 사이의 float라면 만약 None이라면 관련 기능이 사용되지 않습니다.
             이 경우 모든 매매는 전부 사거나 파는 것이여야 하며, 매수와 매도가 반복적으로 이루어지는 방식(즉, 시그널)이여야 합니다.
+        use_price_matrix: True라면(기본값) 시작 전에 거래되는 모든 종목의 (날짜 × 종목) 종가 행렬을 한 번에 만들고
+            매일의 평가액을 행렬에서 계산합니다. 종목이 많을수록 빨라집니다.
+            only_if_transaction_exists가 True라면 사용되지 않습니다.
+        triggers: StopLoss, TakeProfit, TrailingStop, TimeStop과 같은 규칙들입니다.
+            규칙 중 하나라도 발동되면 panic_sell_rate와 같이 다음 transaction을 그 날의 종가로 앞당깁니다.
+            각 거래 후 다음 거래 전까지의 평가액을 한 번에 계산해 가장 먼저 발동되는 날을 찾습니다.
+            panic_sell_rate와 함께 사용할 수 있으며, 마찬가지로 매매는 시그널 방식이어야 합니다.
+            매일의 평가액이 필요하므로 only_if_transaction_exists가 True라면 사용할 수 없습니다.
+        profiler: Profiler를 넘겨주면 단계별, 날짜별 호출 횟수와 누적 시간을 측정합니다.
+            결과는 profiler.report()로 확인할 수 있습니다. None이라면(기본값) 아무것도 측정하지 않습니다.
+        checkpoint: EmulationCheckpoint를 넘겨주면 끝날 때 마지막 상태를 checkpoint에 저장합니다.
+            checkpoint가 비어 있지 않다면 initial_state 대신 checkpoint의 last_date 다음 날부터 이어서 계산하며,
+            이때 transactions에는 last_date 이후의 새로운 transaction만 넣어야 합니다.
+            반환되는 states는 checkpoint의 마지막 State로 시작합니다.
+            이전 계산 때 미리 알려진 transaction만 panic sell로 앞당겨질 수 있다는 점을 제외하면 처음부터 다시 계산한 결과와 같습니다.
+        result_cache: EmulationResultCache를 넘겨주면 입력값과 가격 데이터가 같은 이전 결과가 있을 때 계산하지 않고 불러옵니다.
+            결과가 없다면 계산한 후 저장합니다. checkpoint와 함께 사용하거나 transactions가 전략별 dict라면 무시됩니다.
+        attribute_strategies: True라면 transactions가 전략별 dict일 때 각 State의 strategy_pnls에 전략별 누적 손익을 기록합니다.
+            전략의 누적 손익은 그 전략의 거래로 인한 예산의 변화(수수료 포함)와 그 전략이 보유한 주식의 평가액의 합입니다.
+            initial_state가 보유하던 주식은 어떤 전략에도 포함되지 않습니다. checkpoint와 함께 사용할 수 없습니다.
 
     Returns:
         State의 list를 반환합니다. Dataframe이 아니라는 점을 주의하세요.
         해당 리스트는 시간 순서대로 배열되지만 만약 해당 날짜에 transaction이 여러 개 있다면 date가 겹칠 수 있습니다.
+        panic_sell_rate가 None이 아니라면 states와 함께 날짜별 수익률과 panic sell이 반영된 transactions_df를 반환합니다.
+        이때 입력으로 받은 transactions는 수정되지 않습니다.
     """
+    profiler = profiler or DISABLED_PROFILER
+    if attribute_strategies and not isinstance(transactions, Mapping):
+        raise ValueError(
+            "`transactions` should be a dict of strategies to use `attribute_strategies`."
+        )
+    if attribute_strategies and checkpoint is not None:
+        raise ValueError("`attribute_strategies` cannot be used with `checkpoint`.")
+    if triggers and only_if_transaction_exists:
+        raise ValueError("`triggers` cannot be used with `only_if_transaction_exists`.")
+    # generator는 key를 만들면서 소비되므로 전략별 dict는 캐시하지 않음.
+    if checkpoint is not None or isinstance(transactions, Mapping):
+        result_cache = None
+    cache_arguments = (
+        transactions,
+        initial_state,
+        final_date,
+        only_if_transaction_exists,
+        commission,
+        panic_sell_rate,
+        use_price_matrix,
+        triggers,
+    )
+    if result_cache is not None:
+        key = result_cache.make_key(price_cache, *cache_arguments)
+        result = result_cache.get(key) if key is not None else None
+        if result is not None:
+            profiler.count("result_cache.hit")
+            return result
+        profiler.count("result_cache.miss")
+
+    # get_price의 cache miss 등도 측정할 수 있도록 emulate_trade가 끝날 때까지 현재 profiler로 설정함.
+    # price_cache 자체는 바꾸지 않으므로 다른 thread에서 같은 price_cache를 사용해도 영향을 주지 않음.
+    with use_profiler(profiler):
+        result = _emulate_trade(
+            price_cache,
+            transactions,
+            initial_state,
+            final_date,
+            only_if_transaction_exists,
+            commission,
+            panic_sell_rate,
+            use_price_matrix,
+            triggers,
+            profiler,
+            checkpoint,
+            attribute_strategies,
+        )
+
+    if result_cache is not None:
+        # 계산하는 동안 불러온 구간이 있을 수 있으므로 key를 다시 만듦.
+        key = result_cache.make_key(price_cache, *cache_arguments)
+        if key is not None:
+            result_cache.put(key, result)
+    return result
+
+
+def _emulate_trade(
+    price_cache: PriceCache,
+    transactions: list[Transaction]
+    | pd.DataFrame
+    | TransactionBatch
+    | Mapping[str, Iterable[Transaction]],
+    initial_state: State | None,
+    final_date: datetime | None,
+    only_if_transaction_exists: bool,
+    commission: tuple[float, float] | None,
+    panic_sell_rate: float | None,
+    use_price_matrix: bool,
+    triggers: list[Trigger] | None,
+    profiler: Profiler,
+    checkpoint: EmulationCheckpoint | None,
+    attribute_strategies: bool,
+) -> list[State] | tuple[list[State], list[tuple[datetime, float]], pd.DataFrame]:
     standard_date = datetime(1970, 1, 1)
+    is_resumed = checkpoint is not None and not checkpoint.is_empty
+    if is_resumed and initial_state is not None:
+        raise ValueError("`initial_state` cannot be used with non-empty `checkpoint`.")
+    initial_state = checkpoint.last_state if is_resumed else initial_state
     initial_state = initial_state or INITIAL_STATE
+    triggers = triggers or []
 
-    transactions_df = (
-        pd.DataFrame(transactions) if isinstance(transactions, list) else transactions
+    # 매일 transactions를 query하지 않도록 transaction의 값과 날짜별 위치를 미리 계산함.
+    # transaction_dates는 항상 정렬되어 있기 때문에 다음 transaction은 이진 탐색으로 찾을 수 있음.
+    with profiler.phase("emulate_trade.prepare_transactions"):
+        transaction_rows, row_strategies = _to_transaction_rows(
+            price_cache, transactions
+        )
+    ledger = _StrategyLedger(transactions) if attribute_strategies else None
+    pending_row_count = 0
+    if is_resumed:
+        if transaction_rows and transaction_rows[0][0] <= checkpoint.last_date:
+            raise ValueError(
+                f"Transactions should be after the last date of checkpoint ({checkpoint.last_date}). "
+                f"First transaction: {transaction_rows[0]}"
+            )
+        pending_row_count = len(checkpoint.pending_transaction_rows)
+        # 새로운 transaction이 아직 처리되지 않은 transaction보다 앞설 수 있으므로 날짜 순서대로 합침.
+        # 날짜가 같다면 이전에 알려진 transaction이 먼저 처리됨.
+        transaction_rows = list(
+            heapq.merge(
+                checkpoint.pending_transaction_rows,
+                transaction_rows,
+                key=lambda row: row[0],
+            )
+        )
+    transaction_dates = np.array(
+        [row[0] for row in transaction_rows], dtype="datetime64[ns]"
     )
+    transaction_positions_by_date: dict[datetime, list[int]] = {}
+    for position, row in enumerate(transaction_rows):
+        transaction_positions_by_date.setdefault(row[0], []).append(position)
+    adjusted_positions: set[int] = set()
 
     states = [initial_state]
     Rs = [(initial_state.date, 0.0)]
-    transaction_exist_dates: set[datetime] = set(transactions_df["date"].unique())
+    transaction_exist_dates: set[datetime] = set(transaction_positions_by_date)
     state_after_last_transaction: State | None = None
-    # min과 max 대신 transactions_df['date'][0]와 transactions_df['date'][-1]를 사용할 수도 있음.
-    start_day_diff = (
-        initial_state.date - standard_date
-        if initial_state is not INITIAL_STATE
-        else min(transaction_exist_dates) - standard_date
-    ).days
+    if is_resumed:
+        Rs = [(initial_state.date, checkpoint.last_appraisement_diff_rate)]
+        state_after_last_transaction = checkpoint.state_after_last_transaction
+        start_day_diff = (checkpoint.last_date - standard_date).days + 1
+    else:
+        # min과 max 대신 transaction_dates[0]와 transaction_dates[-1]를 사용할 수도 있음.
+        start_day_diff = (
+            initial_state.date - standard_date
+            if initial_state is not INITIAL_STATE
+            else min(transaction_exist_dates) - standard_date
+        ).days
+    if final_date is None and not transaction_exist_dates:
+        raise ValueError("`final_date` should be specified if there's no transaction.")
     end_day_diff = (
         final_date - standard_date
         if final_date is not None
         else max(transaction_exist_dates) - standard_date
     ).days
+    # 이어서 계산할 때 triggers는 마지막 거래일부터의 평가액이 필요함.
+    price_matrix_start_date = (
+        state_after_last_transaction.date
+        if triggers and state_after_last_transaction is not None
+        else standard_date + timedelta(start_day_diff)
+    )
+    with profiler.phase("emulate_trade.price_matrix"):
+        price_matrix = (
+            PriceMatrix.from_price_cache(
+                price_cache,
+                [*initial_state.stocks, *(row[1] for row in transaction_rows)],
+                price_matrix_start_date,
+                standard_date + timedelta(end_day_diff),
+                _get_holding_spans(
+                    initial_state,
+                    transaction_rows,
+                    price_matrix_start_date,
+                    standard_date + timedelta(end_day_diff),
+                ),
+            )
+            if (use_price_matrix or triggers) and not only_if_transaction_exists
+            else None
+        )
+
+    trigger_date: datetime | None = None
+    if (
+        triggers
+        and price_matrix is not None
+        and state_after_last_transaction is not None
+    ):
+        trigger_date = _find_trigger_date(
+            triggers,
+            price_matrix,
+            state_after_last_transaction,
+            state_after_last_transaction.date,
+            standard_date + timedelta(end_day_diff),
+            transaction_dates,
+        )
     for day_diff in range(start_day_diff, end_day_diff + 1):
         date = standard_date + timedelta(day_diff)
         if not only_if_transaction_exists and date not in transaction_exist_dates:
-            state = State.from_previous_state(price_cache, date, states[-1], None)
+            with profiler.phase("emulate_trade.state", date):
+                state = State.from_previous_state(
+                    price_cache,
+                    date,
+                    states[-1],
+                    None,
+                    price_matrix=price_matrix,
+                    profiler=profiler,
+                )
             if state_after_last_transaction is None:
                 appraisement_diff_rate = 0.0
             else:
@@ -117,36 +347,252 @@ def emulate_trade(
                     state.total_appraisement - state_after_last_transaction.budget,
                 )
 
+            if ledger is not None:
+                ledger.attach_pnls(state)
             states.append(state)
-            if panic_sell_rate is None:
-                continue
-            Rs.append((date, appraisement_diff_rate))
-            if appraisement_diff_rate > -panic_sell_rate:
-                continue
+            if panic_sell_rate is not None:
+                Rs.append((date, appraisement_diff_rate))
 
             # -(700 - 1000) / 1000 >= 0.3
-            transaction = transactions_df.query("date > @date").iloc[0]
-            adjusted_transaction = _adjust_transaction(price_cache, transaction, date)
+            is_panic_sell = (
+                panic_sell_rate is not None
+                and appraisement_diff_rate <= -panic_sell_rate
+            )
+            if not is_panic_sell and date != trigger_date:
+                continue
 
-            transactions_df.loc[
-                transactions_df.query("date > @date").index[0]
-            ] = pd.Series(asdict(adjusted_transaction))
+            with profiler.phase("emulate_trade.panic_sell", date):
+                adjusted_position = _advance_next_transaction(
+                    price_cache,
+                    date,
+                    transaction_rows,
+                    transaction_dates,
+                    transaction_positions_by_date,
+                )
+            if adjusted_position is not None:
+                adjusted_positions.add(adjusted_position)
 
             # continue를 넣지 말 것! 끝난 후 transaction이 처리될 수 있도록 하기 위함.
 
-        transactions_of_date = transactions_df.query("date == @date")
         # 리스트 컴프리헨션으로 바꾸면 오류가 생기니 하지 말 것.
-        for args in transactions_of_date.iloc:
-            state = State.from_previous_state(
-                price_cache,
-                date,
-                states[-1],
-                Transaction(*args),
-                commission=commission,
-            )
+        for position in transaction_positions_by_date.get(date, ()):
+            with profiler.phase("emulate_trade.transaction", date):
+                state = State.from_previous_state(
+                    price_cache,
+                    date,
+                    states[-1],
+                    Transaction(*transaction_rows[position]),
+                    commission=commission,
+                    price_matrix=price_matrix,
+                    profiler=profiler,
+                )
+            if ledger is not None:
+                ledger.record(row_strategies[position], states[-1], state)
+                ledger.attach_pnls(state)
             states.append(state)
         state_after_last_transaction = states[-1]
-    return states if panic_sell_rate is None else (states, Rs, transactions_df)
+
+        if triggers and price_matrix is not None:
+            with profiler.phase("emulate_trade.trigger", date):
+                trigger_date = _find_trigger_date(
+                    triggers,
+                    price_matrix,
+                    state_after_last_transaction,
+                    date,
+                    standard_date + timedelta(end_day_diff),
+                    transaction_dates,
+                )
+
+    if checkpoint is not None:
+        last_date = standard_date + timedelta(end_day_diff)
+        checkpoint.last_date = max(last_date, checkpoint.last_date or last_date)
+        checkpoint.last_state = states[-1]
+        checkpoint.state_after_last_transaction = state_after_last_transaction
+        checkpoint.pending_transaction_rows = [
+            row for row in transaction_rows if row[0] > checkpoint.last_date
+        ]
+        checkpoint.last_appraisement_diff_rate = Rs[-1][1]
+
+    if panic_sell_rate is None:
+        return states
+
+    with profiler.phase("emulate_trade.build_result"):
+        # 이전 checkpoint에서 넘어온 transaction이 있다면 입력값의 위치와 맞지 않으므로 새로 만듦.
+        if isinstance(transactions, pd.DataFrame) and not pending_row_count:
+            # 입력값이 바뀌지 않도록 복사한 후 panic sell로 변경된 transaction만 반영함.
+            transactions_df = transactions.copy()
+            for position in adjusted_positions:
+                transactions_df.loc[transactions_df.index[position]] = pd.Series(
+                    asdict(Transaction(*transaction_rows[position]))
+                )
+        else:
+            transactions_df = pd.DataFrame(
+                transaction_rows, columns=[field.name for field in fields(Transaction)]
+            )
+    return states, Rs, transactions_df
+
+
+def _to_transaction_rows(
+    price_cache: PriceCache,
+    transactions: list[Transaction]
+    | pd.DataFrame
+    | TransactionBatch
+    | Mapping[str, Iterable[Transaction]],
+) -> tuple[list[tuple], list[str] | None]:
+    """transactions를 Transaction(*row)로 다시 만들 수 있는 tuple들로 변환합니다.
+
+    transactions가 전략별 dict라면 각 row가 어떤 전략의 것인지도 함께 반환합니다.
+    """
+    if isinstance(transactions, TransactionBatch):
+        return (
+            transactions.evaluate_sell_prices(price_cache).to_transaction_rows(),
+            None,
+        )
+
+    if isinstance(transactions, pd.DataFrame):
+        return list(transactions.itertuples(index=False, name=None)), None
+
+    if isinstance(transactions, Mapping):
+        transaction_rows = []
+        row_strategies = []
+        for strategy, transaction in merge_transaction_streams(transactions):
+            transaction_rows.append(astuple(transaction))
+            row_strategies.append(strategy)
+        return transaction_rows, row_strategies
+
+    return [
+        tuple(getattr(transaction, field.name) for field in fields(Transaction))
+        for transaction in transactions
+    ], None
+
+
+def _get_holding_spans(
+    initial_state: State,
+    transaction_rows: list[tuple],
+    start_day: datetime,
+    end_day: datetime,
+) -> dict[str, tuple[datetime, datetime]]:
+    """종목별로 start_day부터 마지막으로 보유한 날까지의 기간을 계산합니다.
+
+    panic sell이나 triggers는 거래를 이전 거래 이후의 어느 날로든 앞당길 수 있으므로
+    처음 사는 날이 원래 날짜보다 빨라질 수 있습니다. 따라서 기간은 항상 start_day부터 시작하고,
+    수량이 0이 되는 거래 이후(상장 폐지 이후 등)의 가격만 불러오지 않습니다.
+    거래는 앞당겨지기만 하므로 실제로 보유하는 기간은 항상 이 기간 안에 포함됩니다.
+    """
+    counts = {
+        company_code: count for company_code, (count, _) in initial_state.stocks.items()
+    }
+    spans = {company_code: (start_day, end_day) for company_code in counts}
+    for date, company_code, amount, *_ in transaction_rows:
+        counts[company_code] = counts.get(company_code, 0) + amount
+        spans[company_code] = (
+            start_day,
+            date if counts[company_code] == 0 else end_day,
+        )
+    return spans
+
+
+class _StrategyLedger:
+    """전략별 예산 변화와 보유 수량을 기록해 State마다 전략별 누적 손익을 계산합니다."""
+
+    def __init__(self, strategies: Iterable[str]) -> None:
+        self.cash_flows = {strategy: 0 for strategy in strategies}
+        self.holdings: dict[str, dict[str, int]] = {
+            strategy: {} for strategy in self.cash_flows
+        }
+        # 모든 전략의 수량의 합이 0이 되면 State의 stocks에서 빠지므로 마지막 가격을 따로 기억함.
+        self.last_prices: dict[str, int] = {}
+
+    def record(self, strategy: str, previous_state: State, state: State) -> None:
+        transaction = state.transaction
+        assert transaction is not None
+        self.cash_flows[strategy] += state.budget - previous_state.budget
+        holdings = self.holdings[strategy]
+        holdings[transaction.company_code] = (
+            holdings.get(transaction.company_code, 0) + transaction.amount
+        )
+        self.last_prices[transaction.company_code] = transaction.sell_price
+
+    def attach_pnls(self, state: State) -> None:
+        self.last_prices.update(
+            (company_code, price) for company_code, (_, price) in state.stocks.items()
+        )
+        state.strategy_pnls = {
+            strategy: cash_flow
+            + sum(
+                count * self.last_prices[company_code]
+                for company_code, count in self.holdings[strategy].items()
+            )
+            for strategy, cash_flow in self.cash_flows.items()
+        }
+
+
+def _advance_next_transaction(
+    price_cache: PriceCache,
+    date: datetime,
+    transaction_rows: list[tuple],
+    transaction_dates: np.ndarray,
+    transaction_positions_by_date: dict[datetime, list[int]],
+) -> int | None:
+    """date 이후의 첫 transaction을 date로 앞당기고 date의 종가로 거래하도록 변경한 후 그 위치를 반환합니다."""
+    position = int(
+        np.searchsorted(transaction_dates, np.datetime64(date, "ns"), side="right")
+    )
+    if position == len(transaction_rows):
+        return None
+
+    adjusted_transaction = _adjust_transaction(
+        price_cache, Transaction(*transaction_rows[position]), date
+    )
+
+    transaction_positions_by_date[transaction_rows[position][0]].remove(position)
+    transaction_positions_by_date.setdefault(date, []).append(position)
+    transaction_rows[position] = astuple(adjusted_transaction)
+    # 앞당겨진 날짜는 이전 transaction의 날짜 이상이기 때문에 transaction_dates는 계속 정렬된 상태로 유지됨.
+    transaction_dates[position] = np.datetime64(date, "ns")
+    return position
+
+
+def _find_trigger_date(
+    triggers: list[Trigger],
+    price_matrix: PriceMatrix,
+    state_after_last_transaction: State,
+    date: datetime,
+    end_date: datetime,
+    transaction_dates: np.ndarray,
+) -> datetime | None:
+    """다음 transaction 전까지의 평가액 경로를 한 번에 계산해 triggers가 처음으로 발동되는 날을 찾습니다."""
+    if not state_after_last_transaction.stocks:
+        return None
+
+    next_position = np.searchsorted(
+        transaction_dates, np.datetime64(date, "ns"), side="right"
+    )
+    if next_position < len(transaction_dates):
+        next_transaction_date = pd.Timestamp(
+            transaction_dates[next_position]
+        ).to_pydatetime()
+        end_date = min(end_date, next_transaction_date - timedelta(1))
+    if end_date <= date:
+        return None
+
+    company_codes = list(state_after_last_transaction.stocks)
+    counts = np.array(
+        [count for count, _ in state_after_last_transaction.stocks.values()],
+        dtype=np.float64,
+    )
+    appraisements = (
+        price_matrix.get_closes_between(date + timedelta(1), end_date, company_codes)
+        @ counts
+    )
+    first_breach = find_first_breach(
+        triggers,
+        appraisements,
+        state_after_last_transaction.total_appraisement
+        - state_after_last_transaction.budget,
+        np.arange(1, len(appraisements) + 1),
+    )
+    return None if first_breach is None else date + timedelta(first_breach + 1)
 
 
 def _calculate_appraisement_diff_rate(
@@ -12,3 +12,7 @@ class InvalidPriceError(Exception):
 
 class MojitoInvalidResponseError(StockProjectError):
     """Mojito giving a program invalid data."""
+
+
+class OrderRejectedError(StockProjectError):
+    """Broker rejected an order."""
@@ -1,13 +1,25 @@
 from __future__ import annotations
+from collections.abc import Iterator
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
+import threading
 from typing import Literal, TypedDict
 
 import mojito
+import pandas as pd
 
 from .exceptions import MojitoInvalidResponseError
+from .rate_limit import DEFAULT_SCHEDULER, Priority
+from .trading_calendar import (
+    add_trading_days,
+    count_trading_days,
+    first_trading_day_since,
+)
 
 DATE_FORMAT = r"%Y%m%d"
+# 한 번의 fetch_ohlcv로 불러올 수 있는 최대 데이터 수
+MAX_ROWS_PER_REQUEST = 100
 
 
 class EXAMPLE_STOCK_CODES:
@@ -37,20 +49,57 @@ class PriceDict(TypedDict):
     revl_issu_reas: str
 
 
+SIGNIFICANT_PRICE_NAMES = {
+    "low": "stck_lwpr",
+    "high": "stck_hgpr",
+    "open": "stck_oprc",
+    "close": "stck_clpr",
+}
+# PriceWindow.prices에서 정수로 변환되는 값들
+INTEGER_PRICE_NAMES = (
+    "stck_clpr",
+    "stck_oprc",
+    "stck_hgpr",
+    "stck_lwpr",
+    "acml_vol",
+    "acml_tr_pbmn",
+    "prdy_vrss",
+)
+
+
+@dataclass(frozen=True)
+class PriceWindow:
+    """iter_prices_by_datetime이 한 번에 반환하는 한 구간의 데이터입니다.
+
+    prices는 날짜 순으로 정렬된 DataFrame으로, stck_bsop_date는 datetime64, INTEGER_PRICE_NAMES는 int64,
+    prtt_rate는 float64이고 나머지는 PriceDict와 같이 str입니다.
+    중단된 경우 마지막으로 받은 구간의 end_day를 start_day로 다시 호출하면 이어서 불러올 수 있습니다.
+    """
+
+    start_day: datetime
+    end_day: datetime
+    prices: pd.DataFrame
+
+
 def _fetch_prices_unsafe(
     broker: mojito.KoreaInvestment,
     company_code: str,
     date_type: Literal["D", "W", "M"],
     start_day: datetime,
     end_day: datetime,
+    priority: Priority = Priority.BACKFILL,
 ) -> list[PriceDict]:
     """fetch_prices_by_datetime와 거의 같지만 조회할 데이터가 100을 넘어갈 경우의 안전성을 보장하지 않습니다."""
-    end_day -= timedelta(1)
-    if (start_day - end_day).days >= 100 and date_type == "D":
+    if (
+        date_type == "D"
+        and count_trading_days(start_day, end_day) > MAX_ROWS_PER_REQUEST
+    ):
         logging.warning(
             "Unsafe operation. Data can be truncated. "
             "Use `fetch_prices_by_datetime` to make operation safe."
         )
+    end_day -= timedelta(1)
+    DEFAULT_SCHEDULER.acquire(priority, company_code)
     response = broker.fetch_ohlcv(
         company_code,
         date_type,
@@ -85,27 +134,156 @@ def fetch_prices_by_datetime(
     date_type: Literal["D", "W", "M"],
     start_day: datetime,
     end_day: datetime,
+    priority: Priority = Priority.BACKFILL,
 ) -> list[PriceDict]:
     """broker.fetch_ohlcv의 결과값을 조금 더 편리하게 사용할 수 있도록 변경한 함수입니다.
 
     * string 대신 datetime.datetime을 이용합니다.
     * end_day에 end_day 당일이 포함되지 않습니다.
     * 쿼리가 100개가 넘더라도 문제없이 불러옵니다.
+
+    일봉은 주말과 휴장일을 제외한 거래일 수를 기준으로 한 번에 최대한 100개에 가깝게 요청합니다.
+    응답이 잘렸다면 빠진 기간을 다시 요청해 채우고, 구간 경계에서 겹치는 날짜는 한 번만 포함합니다.
+
+    모든 요청은 DEFAULT_SCHEDULER를 거치며, 기본적으로 주문이나 현재가 조회보다 나중에 처리되는 BACKFILL 우선순위를 가집니다.
+    기간이 길다면 모든 결과를 메모리에 모으지 않는 iter_prices_by_datetime을 사용하세요.
     """
     result = []
+    for _, _, prices in _iter_windows(
+        broker, company_code, date_type, start_day, end_day, priority
+    ):
+        result += prices
+    return result
+
 
-    fraction_start = start_day
-    # 100을 넣는다고 조회되는 데이터 수가 100인 건 아니지만(due to 휴일) 최소한 100은 안전하고 계산하기 쉬움.
-    fraction_end = start_day + timedelta(100)
-    while fraction_start < end_day:
-        print(fraction_start.strftime(DATE_FORMAT), fraction_end.strftime(DATE_FORMAT))
-        result += _fetch_prices_unsafe(
-            broker, company_code, date_type, fraction_start, fraction_end
+def iter_prices_by_datetime(
+    broker: mojito.KoreaInvestment,
+    company_code: str,
+    date_type: Literal["D", "W", "M"],
+    start_day: datetime,
+    end_day: datetime,
+    priority: Priority = Priority.BACKFILL,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[PriceWindow]:
+    """fetch_prices_by_datetime과 같은 데이터를 한 구간(최대 100개)씩 받는 대로 PriceWindow로 반환하는 generator입니다.
+
+    다음 구간은 이전 구간을 소비한 후에 요청하기 때문에 기간이 길어도 메모리 사용량이 일정하며,
+    받은 구간을 바로 캐시나 파일에 저장할 수 있습니다.
+
+    cancel_event가 set되면 다음 요청을 보내기 전에 멈춥니다. generator의 close()를 호출해도 멈출 수 있습니다.
+    멈춘 후에는 마지막으로 받은 PriceWindow의 end_day를 start_day로 넘겨주면 이어서 불러올 수 있습니다.
+    """
+    for window_start, window_end, prices in _iter_windows(
+        broker, company_code, date_type, start_day, end_day, priority, cancel_event
+    ):
+        yield PriceWindow(window_start, window_end, _to_typed_prices(prices))
+
+
+def _iter_windows(
+    broker: mojito.KoreaInvestment,
+    company_code: str,
+    date_type: Literal["D", "W", "M"],
+    start_day: datetime,
+    end_day: datetime,
+    priority: Priority,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[tuple[datetime, datetime, list[PriceDict]]]:
+    """기간을 한 번에 불러올 수 있는 구간들로 나눠 차례대로 불러옵니다. 구간 경계에서 겹치는 날짜는 한 번만 포함합니다."""
+    # 겹치는 날짜는 바로 앞 구간과만 생기므로 이전 구간의 날짜만 기억함.
+    previous_dates: set[str] = set()
+
+    window_start = start_day
+    while window_start < end_day:
+        if cancel_event is not None and cancel_event.is_set():
+            logging.info(
+                f"Fetching {company_code} is cancelled before {window_start.strftime(DATE_FORMAT)}."
+            )
+            return
+
+        window_end = min(_get_window_end(window_start, date_type), end_day)
+        logging.debug(
+            f"Fetching {company_code} from {window_start.strftime(DATE_FORMAT)} "
+            f"to {window_end.strftime(DATE_FORMAT)}."
         )
+        prices = [
+            price
+            for price in _fetch_window(
+                broker, company_code, date_type, window_start, window_end, priority
+            )
+            if price["stck_bsop_date"] not in previous_dates
+        ]
+        previous_dates = {price["stck_bsop_date"] for price in prices}
+        yield window_start, window_end, prices
 
-        fraction_start = fraction_end
-        fraction_end += timedelta(100)
-        if fraction_end >= end_day:
-            fraction_end = end_day
+        window_start = window_end
 
-    return result
+
+def _to_typed_prices(prices: list[PriceDict]) -> pd.DataFrame:
+    """PriceDict의 list를 날짜 순으로 정렬하고 값들을 알맞은 타입으로 바꾼 DataFrame으로 만듭니다."""
+    typed_prices = pd.DataFrame(prices, columns=list(PriceDict.__annotations__))
+    typed_prices["stck_bsop_date"] = pd.to_datetime(
+        typed_prices["stck_bsop_date"], format=DATE_FORMAT
+    )
+    typed_prices[list(INTEGER_PRICE_NAMES)] = (
+        typed_prices[list(INTEGER_PRICE_NAMES)].apply(pd.to_numeric).astype("int64")
+    )
+    typed_prices["prtt_rate"] = pd.to_numeric(typed_prices["prtt_rate"]).astype(
+        "float64"
+    )
+    return typed_prices.sort_values("stck_bsop_date", ignore_index=True)
+
+
+def _get_window_end(
+    window_start: datetime, date_type: Literal["D", "W", "M"]
+) -> datetime:
+    """한 번의 요청으로 불러올 수 있는 기간의 끝(당일 미포함)을 계산합니다."""
+    match date_type:
+        case "D":
+            return add_trading_days(window_start, MAX_ROWS_PER_REQUEST)
+        case "W":
+            # 기간의 처음과 끝이 주 중간에 걸칠 수 있으므로 한 주를 빼고 계산함.
+            return window_start + timedelta(7 * (MAX_ROWS_PER_REQUEST - 1))
+        case "M":
+            return window_start + timedelta(28 * (MAX_ROWS_PER_REQUEST - 1))
+    raise ValueError(f"Unknown date_type '{date_type}'.")
+
+
+def _fetch_window(
+    broker: mojito.KoreaInvestment,
+    company_code: str,
+    date_type: Literal["D", "W", "M"],
+    window_start: datetime,
+    window_end: datetime,
+    priority: Priority,
+) -> list[PriceDict]:
+    """한 구간을 불러오고, 응답이 잘려 앞부분이 빠졌다면 빠진 기간을 다시 불러와 뒤에 붙입니다.
+
+    API는 최근 날짜부터 최대 100개를 반환하기 때문에 잘린 응답에서는 항상 앞부분(과거)이 빠집니다.
+    """
+    prices = _fetch_prices_unsafe(
+        broker, company_code, date_type, window_start, window_end, priority
+    )
+    while len(prices) >= MAX_ROWS_PER_REQUEST:
+        earliest_day = datetime.strptime(
+            min(price["stck_bsop_date"] for price in prices), DATE_FORMAT
+        )
+        if date_type == "D" and earliest_day <= first_trading_day_since(window_start):
+            break
+        if earliest_day <= window_start:
+            break
+
+        logging.info(
+            f"Response of {company_code} is truncated before {earliest_day.strftime(DATE_FORMAT)}. "
+            "Fetching the missing range."
+        )
+        try:
+            missing_prices = _fetch_prices_unsafe(
+                broker, company_code, date_type, window_start, earliest_day, priority
+            )
+        except MojitoInvalidResponseError:
+            # 상장 전이라 빠진 기간에 데이터가 없음.
+            break
+        prices += missing_prices
+        if len(missing_prices) < MAX_ROWS_PER_REQUEST:
+            break
+    return prices
@@ -0,0 +1,126 @@
+"""여러 지정가 주문을 호가 단위에 맞춘 후 초당 요청 제한 안에서 동시에 제출합니다."""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Literal
+import logging
+import time
+
+import mojito
+
+from .adjust_price import adjust_price_units
+from .exceptions import OrderRejectedError
+from .rate_limit import DEFAULT_RATE_LIMITER, Priority, RateLimiter
+
+# 한국투자증권 API가 초당 거래건수를 초과했을 때 보내는 메시지 코드
+RATE_LIMIT_EXCEEDED_MESSAGE_CODE = "EGW00201"
+# 주문이 broker에 전달되기 전에 발생하는 것이 확실한 예외들. 이 예외들만 다시 시도해도 주문이 중복되지 않음.
+RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (ConnectionRefusedError,)
+
+
+@dataclass(frozen=True)
+class Order:
+    """지정가 주문 하나를 나타냅니다. side가 'buy'라면 매수, 'sell'이라면 매도입니다."""
+
+    symbol: str
+    side: Literal["buy", "sell"]
+    price: int
+    quantity: int
+
+
+@dataclass
+class OrderResult:
+    """주문 하나의 제출 결과입니다.
+
+    price는 호가 단위에 맞춰 실제로 제출한 가격이고, latency는 처음 제출을 시도한 후 끝날 때까지 걸린 초입니다.
+    주문이 실패했다면 error에 마지막으로 발생한 예외가 담깁니다.
+    """
+
+    order: Order
+    price: int
+    response: dict | None
+    error: Exception | None
+    attempts: int
+    latency: float
+
+    @property
+    def is_success(self) -> bool:
+        return self.error is None
+
+
+def submit_orders(
+    broker: mojito.KoreaInvestment,
+    orders: list[Order],
+    adjust_mode: Literal["round", "floor", "ceil"] = "round",
+    max_workers: int = 8,
+    retries: int = 2,
+    rate_limiter: RateLimiter | None = None,
+) -> list[OrderResult]:
+    """orders의 가격을 한 번에 호가 단위에 맞춘 후 thread pool에서 동시에 제출합니다.
+
+    Args:
+        adjust_mode: 호가 단위를 맞추는 방식입니다. adjust_price_unit의 mode와 같습니다.
+        max_workers: 동시에 제출할 수 있는 최대 주문 수입니다.
+        retries: 초당 거래건수 초과로 거부되었거나 RETRYABLE_ERRORS의 예외가 발생한 주문을 다시 시도하는 횟수입니다.
+            다른 예외는 주문이 이미 전달되었을 수 있으므로 다시 시도하지 않고 실패로 기록합니다.
+            잔고 부족처럼 다시 시도해도 의미가 없는 거부도 다시 시도하지 않습니다.
+        rate_limiter: 초당 요청 수를 제한합니다. None이라면 다른 함수들과 공유하는 기본 RequestScheduler를 사용하며,
+            주문은 현재가 조회나 과거 데이터 조회보다 먼저 처리됩니다.
+
+    Returns:
+        orders와 같은 순서의 OrderResult의 list입니다.
+    """
+    rate_limiter = rate_limiter or DEFAULT_RATE_LIMITER
+    prices = adjust_price_units([order.price for order in orders], adjust_mode).tolist()
+
+    def submit(order: Order, price: int) -> OrderResult:
+        create_order = (
+            broker.create_limit_buy_order
+            if order.side == "buy"
+            else broker.create_limit_sell_order
+        )
+        start_time = time.perf_counter()
+        response = None
+        error: Exception | None = None
+        for attempt in range(1, retries + 2):
+            rate_limiter.acquire(Priority.ORDER, order.symbol)
+            try:
+                response = create_order(
+                    symbol=order.symbol, price=price, quantity=order.quantity
+                )
+            except Exception as e:  # broker에서 어떤 예외가 발생할지 알 수 없음.
+                error = e
+                if _is_retryable(e):
+                    continue
+                # 주문이 이미 전달되었을 수 있으므로 다시 제출하지 않음.
+                break
+
+            # rt_cd가 없는 응답은 성공했는지 알 수 없으므로 실패로 처리함.
+            if response.get("rt_cd") == "0":
+                error = None
+                break
+
+            error = OrderRejectedError(
+                f"Order is rejected. order: {order}, response: {response}"
+            )
+            if response.get("msg_cd") != RATE_LIMIT_EXCEEDED_MESSAGE_CODE:
+                break
+
+        if error is not None:
+            logging.warning(f"Failed to submit order {order}: {error}")
+        return OrderResult(
+            order, price, response, error, attempt, time.perf_counter() - start_time
+        )
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(submit, orders, prices))
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """error나 error의 원인 중에 RETRYABLE_ERRORS가 있는지 확인합니다. HTTP 라이브러리가 예외를 감싸는 경우를 위함입니다."""
+    while error is not None:
+        if isinstance(error, RETRYABLE_ERRORS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from collections.abc import Iterable
+import itertools
+import math
+
+import mojito
+import pandas as pd
+
+from .emulate_trade import emulate_trade
+from .price_cache import PriceCache
+from .price_matrix import LOOKBACK_DAYS
+from .stock_statistics import CAGR, MDD
+from .transaction_and_state import State, Transaction
+
+# 각 worker process가 공유하는 읽기 전용 데이터. _initialize_worker에서 한 번만 설정됨.
+_worker_context: tuple[PriceCache, pd.DataFrame, State | None, datetime | None]
+# worker에 넘겨주는 가격 데이터. (broker, standard_day, 캐시된 구간들, 구간들을 불러온 시점)
+_PriceData = tuple[
+    mojito.KoreaInvestment,
+    datetime,
+    dict[tuple[str, int], pd.DataFrame],
+    dict[tuple[str, int], datetime],
+]
+
+
+def sweep_emulate_trade(
+    price_cache: PriceCache,
+    transactions: list[Transaction] | pd.DataFrame,
+    param_grid: dict[str, Iterable],
+    initial_state: State | None = None,
+    final_date: datetime | None = None,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """param_grid의 모든 조합에 대해 emulate_trade를 process pool에서 병렬로 실행하고 결과를 표로 반환합니다.
+
+    transactions는 한 번만 DataFrame으로 변환되며 각 worker에는 process마다 한 번만 전달됩니다.
+    각 실행은 입력값의 복사본을 사용하기 때문에 transactions와 initial_state는 수정되지 않습니다.
+
+    Args:
+        param_grid: emulate_trade의 keyword argument 이름과 시도할 값들입니다.
+            예를 들어 `{"panic_sell_rate": [0.1, 0.2], "commission": [None, (0.00015, 0.003015)]}`라면 4번 실행합니다.
+        max_workers: 사용할 process의 수입니다. None이라면 CPU 개수만큼 사용합니다.
+            1이라면 process pool을 사용하지 않고 현재 process에서 실행합니다.
+
+    Returns:
+        조합마다 한 행을 가지는 DataFrame입니다. param_grid의 각 이름이 열이 되고,
+        마지막 총 평가액(final_appraisement), MDD, CAGR이 함께 계산됩니다.
+        CAGR을 계산할 수 없는 경우(초기 예산이 0인 경우 등) NaN이 됩니다.
+    """
+    transactions_df = (
+        pd.DataFrame(transactions) if isinstance(transactions, list) else transactions
+    )
+    param_names = list(param_grid)
+    param_combinations = [
+        dict(zip(param_names, values))
+        for values in itertools.product(*param_grid.values())
+    ]
+    # 각 process가 따로 fetch하지 않도록 필요한 가격 데이터를 미리 캐시에 불러옴.
+    start_day = (
+        initial_state.date
+        if initial_state is not None
+        else transactions_df["date"].min()
+    )
+    end_day = final_date if final_date is not None else transactions_df["date"].max()
+    company_codes = [
+        *transactions_df["company_code"].unique(),
+        *(initial_state.stocks if initial_state is not None else ()),
+    ]
+    for company_code in company_codes:
+        price_cache.get_prices_between_range(
+            start_day - timedelta(LOOKBACK_DAYS), end_day + timedelta(1), company_code
+        )
+
+    if max_workers == 1:
+        context = (price_cache, transactions_df, initial_state, final_date)
+        results = [
+            _run_single_emulation(params, context) for params in param_combinations
+        ]
+    else:
+        # PriceCache를 통째로 넘기면 worker마다 캐시 파일 전체를 다시 불러오므로 필요한 구간만 넘김.
+        price_data = (
+            price_cache.broker,
+            price_cache._standard_day,
+            *price_cache._export_chunks(company_codes),
+        )
+        with ProcessPoolExecutor(
+            max_workers,
+            initializer=_initialize_worker,
+            initargs=(price_data, transactions_df, initial_state, final_date),
+        ) as executor:
+            results = list(executor.map(_run_single_emulation, param_combinations))
+
+    # None(사용하지 않음)이 NaN으로 바뀌지 않도록 None이 있는 열은 object로 유지함.
+    param_columns = {
+        name: pd.Series(
+            [params[name] for params in param_combinations],
+            dtype=object
+            if any(params[name] is None for params in param_combinations)
+            else None,
+        )
+        for name in param_names
+    }
+    return pd.concat(
+        [
+            pd.DataFrame(param_columns, index=range(len(param_combinations))),
+            pd.DataFrame(
+                results,
+                index=range(len(param_combinations)),
+                columns=["final_appraisement", "MDD", "CAGR"],
+            ),
+        ],
+        axis=1,
+    )
+
+
+def _initialize_worker(
+    price_data: _PriceData,
+    transactions_df: pd.DataFrame,
+    initial_state: State | None,
+    final_date: datetime | None,
+) -> None:
+    global _worker_context
+    # 캐시 파일을 불러오거나 저장하지 않고 넘겨받은 구간들만 사용함.
+    price_cache = PriceCache._from_chunks(*price_data)
+    _worker_context = (price_cache, transactions_df, initial_state, final_date)
+
+
+def _run_single_emulation(
+    params: dict,
+    context: tuple[PriceCache, pd.DataFrame, State | None, datetime | None]
+    | None = None,
+) -> dict[str, float]:
+    price_cache, transactions_df, initial_state, final_date = (
+        context or _worker_context
+    )
+    result = emulate_trade(
+        price_cache,
+        transactions_df,
+        initial_state,
+        final_date,
+        **params,
+    )
+    states = result if isinstance(result, list) else result[0]
+
+    try:
+        cagr = CAGR(states)
+    except (ValueError, ZeroDivisionError):
+        cagr = math.nan
+
+    return {
+        "final_appraisement": states[-1].total_appraisement,
+        "MDD": MDD(states),
+        "CAGR": cagr,
+    }
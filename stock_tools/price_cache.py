@@ -1,28 +1,78 @@
 from __future__ import annotations
 from datetime import datetime, timedelta
+import functools
 import pickle
+import threading
 from typing import Literal
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 import mojito
+import numpy as np
 import pandas as pd
 
-from .fetch import DATE_FORMAT, _fetch_prices_unsafe, PriceDict
-from .exceptions import NoTransactionError
+from .fetch import (
+    DATE_FORMAT,
+    SIGNIFICANT_PRICE_NAMES,
+    _fetch_prices_unsafe,
+    PriceDict,
+)
+from .exceptions import MojitoInvalidResponseError, NoTransactionError
 from .key import KEY
-
+from .profiling import get_current_profiler
 
 MAX_DATE_LIMIT = 100
+# 캐시의 한 구간의 길이(일). 20주는 주말을 제외하면 100일이므로 한 구간은 항상 한 번의 요청으로 불러올 수 있음.
+CACHE_CHUNK_DAYS = 140
+# 구간의 길이가 저장되지 않은 예전 캐시 파일의 구간 길이
+_LEGACY_CACHE_CHUNK_DAYS = 100
+
+# ingest_files에서 기본으로 사용하는 파일의 열 이름과 PriceDict의 key 사이의 대응
+INGEST_COLUMN_NAMES = {
+    "date": "stck_bsop_date",
+    **{name: key for name, key in SIGNIFICANT_PRICE_NAMES.items()},
+    "volume": "acml_vol",
+    "trading_value": "acml_tr_pbmn",
+    "code": "company_code",
+}
+# 파일에 없는 PriceDict의 값들을 채울 기본값
+_INGEST_DEFAULT_VALUES = {
+    "acml_vol": "0",
+    "acml_tr_pbmn": "0",
+    "flng_cls_code": "00",
+    "prtt_rate": "0.00",
+    "mod_yn": "N",
+    "prdy_vrss_sign": "3",
+    "prdy_vrss": "0",
+    "revl_issu_reas": "",
+}
+
+
+def _synchronized(method):
+    """여러 thread가 같은 PriceCache를 사용해도 캐시가 깨지지 않도록 method를 PriceCache의 lock 안에서 실행합니다."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class PriceCache:
-    """Price를 가지고 올 때마다 fetch하지 않고 caching해 더욱 빠르고 간편하게 정보를 가져올 수 있도록 하는 클래스입니다."""
+    """Price를 가지고 올 때마다 fetch하지 않고 caching해 더욱 빠르고 간편하게 정보를 가져올 수 있도록 하는 클래스입니다.
+
+    캐시를 바꾸는 메서드는 lock 안에서 실행되므로 여러 thread에서 같은 PriceCache를 사용할 수 있습니다.
+    """
 
     cache_prices: bool = True
     cache_directory: Path = Path("_cache")
+    # 오늘이나 미래가 포함되어 불완전하거나 수정주가 표시가 있는 구간은 불러온 지 이 시간이 지나면 다시 불러옴.
+    refresh_after: timedelta = timedelta(hours=1)
 
     def __new__(cls, *args, **kwargs):
         self = super().__new__(cls)
+        self._lock = threading.RLock()
         if cls.cache_prices:
             self._control_cache_file("load")
         return self
@@ -35,10 +85,36 @@ class PriceCache:
         """company_code가 None이라면 get_price에서 company_code는 생략할 수 없습니다."""
         self.broker = broker
         self.default_company_code = default_company_code
+        if not hasattr(self, "_lock"):
+            self._lock = threading.RLock()
         if not hasattr(self, "_cache"):
             self._standard_day = datetime(1970, 1, 1)
             self._is_standard_day_smartly_defined = False
             self._cache: dict[tuple[str, int], pd.DataFrame] = {}
+        if not hasattr(self, "_fetched_at"):
+            self._fetched_at: dict[tuple[str, int], datetime] = {}
+        if not hasattr(self, "_seen_revision_dates"):
+            # 구간을 불러올 때 알고 있던 그 종목의 마지막 수정주가 표시 날짜
+            self._seen_revision_dates: dict[tuple[str, int], str] = {}
+        if not hasattr(self, "_revision_dates"):
+            # 종목별로 캐시된 구간들 중 마지막 수정주가 표시 날짜. 캐시로부터 계산되므로 저장하지 않음.
+            self._revision_dates: dict[str, str] = {}
+            for (company_code, _), prices in self._cache.items():
+                self._revision_dates[company_code] = max(
+                    _get_revision_date(prices),
+                    self._revision_dates.get(company_code, ""),
+                )
+        if not hasattr(self, "_resampled_cache"):
+            self._resampled_cache: dict[tuple, pd.DataFrame] = {}
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
 
     @classmethod
     def from_broker_kwargs(
@@ -55,52 +131,433 @@ class PriceCache:
     ) -> PriceCache:
         return cls(mojito.KoreaInvestment(**KEY), default_company_code)
 
+    @classmethod
+    def _from_chunks(
+        cls,
+        broker: mojito.KoreaInvestment,
+        standard_day: datetime,
+        cache: dict[tuple[str, int], pd.DataFrame],
+        fetched_at: dict[tuple[str, int], datetime],
+    ) -> PriceCache:
+        """캐시 파일을 불러오지 않고 주어진 구간들로만 PriceCache를 만듭니다. 만들어진 PriceCache는 캐시 파일에 저장하지 않습니다."""
+        self = object.__new__(cls)
+        self.cache_prices = False
+        self._standard_day = standard_day
+        self._is_standard_day_smartly_defined = True
+        self._cache = cache
+        self._fetched_at = fetched_at
+        self.__init__(broker)
+        return self
+
+    @_synchronized
+    def _export_chunks(
+        self, company_codes: Iterable[str]
+    ) -> tuple[dict[tuple[str, int], pd.DataFrame], dict[tuple[str, int], datetime]]:
+        """company_codes의 캐시된 구간들과 그 구간들을 불러온 시점을 반환합니다. _from_chunks와 함께 사용합니다."""
+        company_codes = set(company_codes)
+        return (
+            {
+                key: prices
+                for key, prices in self._cache.items()
+                if key[0] in company_codes
+            },
+            {
+                key: fetched_at
+                for key, fetched_at in self._fetched_at.items()
+                if key[0] in company_codes
+            },
+        )
+
+    @_synchronized
     def set_standard_day(self, standard_day: datetime) -> None:
         """주의: 기존의 모든 cache가 삭제됩니다. standard_day는 임의의 날짜로 정할 수 있습니다(제약이 없습니다)."""
         self._is_standard_day_smartly_defined = True
         self._standard_day = standard_day
         self._cache.clear()
+        self._fetched_at.clear()
+        self._seen_revision_dates.clear()
+        self._revision_dates.clear()
+        self._resampled_cache.clear()
 
     def _get_day_category(
         self,
         day: datetime,
     ) -> tuple[int, tuple[datetime, datetime]]:
-        date_category, mod = divmod((day - self._standard_day).days, 100)
+        date_category, mod = divmod((day - self._standard_day).days, CACHE_CHUNK_DAYS)
 
         start_day = day - timedelta(mod)
-        end_day = start_day + timedelta(100)
+        end_day = start_day + timedelta(CACHE_CHUNK_DAYS)
 
         return date_category, (start_day, end_day)
 
+    @_synchronized
     def _control_cache_file(self, action: Literal["store", "delete", "load"]):
         cache_location = self.cache_directory / f"{self.__class__.__name__}.pickle"
         match action:
             case "store":
                 self.__class__.cache_directory.mkdir(exist_ok=True, parents=True)
-                cache_location.write_bytes(pickle.dumps((self._cache, self._standard_day)))
+                cache_location.write_bytes(
+                    pickle.dumps(
+                        (
+                            self._cache,
+                            self._standard_day,
+                            self._fetched_at,
+                            CACHE_CHUNK_DAYS,
+                            self._seen_revision_dates,
+                        )
+                    )
+                )
             case "delete":
                 cache_location.unlink(missing_ok=True)
             case "load":
                 if cache_location.exists():
-                    self._cache, self._standard_day = pickle.loads(cache_location.read_bytes())
+                    cache_data = pickle.loads(cache_location.read_bytes())
+                    # 예전 형식의 캐시에는 언제 불러왔는지와 구간의 길이, 수정주가 표시에 대한 정보가 없음.
+                    if len(cache_data) == 2:
+                        cache_data = (*cache_data, {})
+                    if len(cache_data) == 3:
+                        cache_data = (*cache_data, _LEGACY_CACHE_CHUNK_DAYS)
+                    if len(cache_data) == 4:
+                        cache_data = (*cache_data, {})
+                    (
+                        self._cache,
+                        self._standard_day,
+                        self._fetched_at,
+                        chunk_days,
+                        self._seen_revision_dates,
+                    ) = cache_data
                     self._is_standard_day_smartly_defined = True
+                    if chunk_days != CACHE_CHUNK_DAYS:
+                        self._rechunk_cache(chunk_days)
+
+    def _rechunk_cache(self, old_chunk_days: int) -> None:
+        """다른 구간 길이로 저장된 캐시를 CACHE_CHUNK_DAYS 단위로 다시 나눕니다.
 
+        이전 구간들로 완전히 채워지지 않는 새 구간은 버려지고 필요할 때 다시 불러옵니다.
+        """
+        old_cache, old_fetched_at = self._cache, self._fetched_at
+        self._cache, self._fetched_at = {}, {}
+        self._seen_revision_dates = {}
+
+        old_date_categories: dict[str, set[int]] = {}
+        for company_code, old_date_category in old_cache:
+            old_date_categories.setdefault(company_code, set()).add(old_date_category)
+
+        for company_code, old_categories in old_date_categories.items():
+            first_day = min(old_categories) * old_chunk_days
+            last_day = (max(old_categories) + 1) * old_chunk_days - 1
+            for date_category in range(
+                first_day // CACHE_CHUNK_DAYS, last_day // CACHE_CHUNK_DAYS + 1
+            ):
+                start_day = date_category * CACHE_CHUNK_DAYS
+                end_day = start_day + CACHE_CHUNK_DAYS - 1
+                needed_categories = range(
+                    start_day // old_chunk_days, end_day // old_chunk_days + 1
+                )
+                if not all(
+                    old_category in old_categories for old_category in needed_categories
+                ):
+                    continue
+
+                prices = pd.concat(
+                    [
+                        old_cache[(company_code, old_category)]
+                        for old_category in needed_categories
+                    ],
+                    ignore_index=True,
+                )
+                if not prices.empty:
+                    days = (
+                        pd.to_datetime(prices["stck_bsop_date"], format=DATE_FORMAT)
+                        - pd.Timestamp(self._standard_day)
+                    ).dt.days
+                    prices = prices[days.between(start_day, end_day)].reset_index(
+                        drop=True
+                    )
+                key = (company_code, date_category)
+                self._cache[key] = prices
+                fetched_ats = [
+                    old_fetched_at[(company_code, old_category)]
+                    for old_category in needed_categories
+                    if (company_code, old_category) in old_fetched_at
+                ]
+                if len(fetched_ats) == len(needed_categories):
+                    self._fetched_at[key] = min(fetched_ats)
+
+    @_synchronized
     def _store_cache_of_day(self, day: datetime, company_code: str) -> int:
         """캐시에 해당 day에 대한 캐시를 저장하고 date_category를 반환합니다."""
         date_category, (start_day, end_day) = self._get_day_category(day)
+        # emulate_trade에 Profiler가 주어지면 그동안 cache hit/miss와 fetch 시간 등을 측정함.
+        profiler = get_current_profiler()
 
-        if (company_code, date_category) in self._cache:
+        if (company_code, date_category) in self._cache and not self._is_stale(
+            company_code, date_category, end_day
+        ):
+            profiler.count("price_cache.hit")
             return date_category  # Cache hit!
 
-        self._cache[(company_code, date_category)] = pd.DataFrame(
-            _fetch_prices_unsafe(self.broker, company_code, "D", start_day, end_day)
-        )
-        self._control_cache_file("store")
+        profiler.count("price_cache.miss")
+        with profiler.phase("price_cache.fetch"):
+            self._cache[(company_code, date_category)] = pd.DataFrame(
+                _fetch_prices_unsafe(self.broker, company_code, "D", start_day, end_day)
+            )
+        self._fetched_at[(company_code, date_category)] = datetime.now()
+        self._record_revision_date(company_code, date_category)
+        self._clear_resampled_cache(company_code)
+        if self.cache_prices:
+            self._control_cache_file("store")
         return date_category
 
+    def _is_stale(
+        self, company_code: str, date_category: int, end_day: datetime
+    ) -> bool:
+        """캐시된 구간을 다시 불러와야 하는지 확인합니다.
+
+        구간을 불러온 시점이 구간이 끝나기 전이라 데이터가 불완전하거나
+        구간을 불러온 후 그 종목에 새로운 수정주가 관련 표시(mod_yn, revl_issu_reas)가 생겨
+        수정주가가 바뀌었을 수 있는 구간은 불러온 지 refresh_after가 지나면 다시 불러옵니다.
+        """
+        now = datetime.now()
+        fetched_at = self._fetched_at.get((company_code, date_category))
+        if fetched_at is None:
+            # 언제 불러왔는지 알 수 없는 예전 캐시는 미래가 포함된 경우에만 다시 불러옴.
+            return now < end_day
+
+        if now - fetched_at < self.refresh_after:
+            return False
+
+        if fetched_at < end_day:
+            return True
+
+        revision_date = self._revision_dates.get(company_code, "")
+        # 수정주가 표시 날짜가 기록되지 않은 예전 캐시는 지금 알고 있는 날짜를 본 것으로 취급함.
+        seen_revision_date = self._seen_revision_dates.setdefault(
+            (company_code, date_category), revision_date
+        )
+        return seen_revision_date != revision_date
+
+    def _record_revision_date(self, company_code: str, date_category: int) -> None:
+        """새로 저장한 구간의 수정주가 표시를 종목의 마지막 수정주가 표시 날짜에 반영하고 그 날짜를 본 것으로 기록합니다."""
+        revision_date = max(
+            _get_revision_date(self._cache[(company_code, date_category)]),
+            self._revision_dates.get(company_code, ""),
+        )
+        self._revision_dates[company_code] = revision_date
+        self._seen_revision_dates[(company_code, date_category)] = revision_date
+
+    @_synchronized
+    def _clear_resampled_cache(self, company_code: str) -> None:
+        for key in [key for key in self._resampled_cache if key[0] == company_code]:
+            del self._resampled_cache[key]
+
+    @_synchronized
+    def _get_chunk_versions(
+        self, company_codes: Iterable[str], start_day: datetime, end_day: datetime
+    ) -> tuple[tuple[str, int, str], ...] | None:
+        """start_day부터 end_day까지를 포함하는 구간들을 언제 불러왔는지를 반환합니다. 구간의 데이터가 바뀌면 값도 바뀝니다.
+
+        캐시되지 않은 구간은 빈 문자열로 표시하며, 다시 불러와야 하는 구간이 있다면 None을 반환합니다.
+        """
+        versions = []
+        for company_code in sorted(set(company_codes)):
+            day = start_day
+            while True:
+                date_category, (_, chunk_end_day) = self._get_day_category(day)
+                key = (company_code, date_category)
+                if key in self._cache and self._is_stale(*key, chunk_end_day):
+                    return None
+                fetched_at = self._fetched_at.get(key)
+                versions.append(
+                    (
+                        company_code,
+                        date_category,
+                        ""
+                        if key not in self._cache
+                        else "legacy"
+                        if fetched_at is None
+                        else fetched_at.isoformat(),
+                    )
+                )
+                if chunk_end_day > end_day:
+                    break
+                day = chunk_end_day
+        return tuple(versions)
+
+    @_synchronized
+    def refresh(
+        self,
+        company_codes: Iterable[str] | None = None,
+        until: datetime | None = None,
+    ) -> None:
+        """캐시된 종목들의 마지막으로 캐시된 날 이후의 데이터만 불러와 캐시에 추가합니다.
+
+        마지막으로 캐시된 날은 장중에 불러와 불완전할 수 있기 때문에 다시 불러옵니다.
+
+        Args:
+            company_codes: 갱신할 종목들입니다. None이라면 캐시된 모든 종목을 갱신합니다.
+            until: 이 날까지(당일 포함) 갱신합니다. None이라면 오늘까지 갱신합니다.
+        """
+        until = until or datetime.now()
+        last_date_categories: dict[str, int] = {}
+        for company_code, date_category in self._cache:
+            last_date_categories[company_code] = max(
+                date_category, last_date_categories.get(company_code, date_category)
+            )
+        if company_codes is not None:
+            last_date_categories = {
+                company_code: last_date_categories[company_code]
+                for company_code in company_codes
+                if company_code in last_date_categories
+            }
+
+        for company_code, last_date_category in last_date_categories.items():
+            key = (company_code, last_date_category)
+            chunk_start_day = self._standard_day + timedelta(
+                last_date_category * CACHE_CHUNK_DAYS
+            )
+            chunk_end_day = chunk_start_day + timedelta(CACHE_CHUNK_DAYS)
+            prices = self._cache[key]
+
+            if not prices.empty and chunk_start_day <= until:
+                last_date = prices["stck_bsop_date"].max()
+                fetch_start_day = datetime.strptime(last_date, DATE_FORMAT)
+                try:
+                    new_prices = pd.DataFrame(
+                        _fetch_prices_unsafe(
+                            self.broker,
+                            company_code,
+                            "D",
+                            fetch_start_day,
+                            min(chunk_end_day, until + timedelta(1)),
+                        )
+                    )
+                except MojitoInvalidResponseError:
+                    # 새로 불러온 데이터가 없다면 마지막으로 캐시된 날의 데이터를 버리지 않고 그대로 둠.
+                    pass
+                else:
+                    self._cache[key] = pd.concat(
+                        [new_prices, prices[prices["stck_bsop_date"] < last_date]],
+                        ignore_index=True,
+                    )
+                    self._record_revision_date(*key)
+                    self._clear_resampled_cache(company_code)
+                self._fetched_at[key] = datetime.now()
+
+            # 마지막 구간 이후의 구간들은 새로 불러옴.
+            day = chunk_end_day
+            while day <= until:
+                self._store_cache_of_day(day, company_code)
+                day += timedelta(CACHE_CHUNK_DAYS)
+
+        if self.cache_prices:
+            self._control_cache_file("store")
+
+    @_synchronized
+    def ingest_files(
+        self,
+        paths: Iterable[str | Path],
+        company_code: str | None = None,
+        column_names: dict[str, str] | None = None,
+        chunksize: int = 100_000,
+    ) -> int:
+        """CSV나 Parquet 파일의 일봉 데이터를 API를 호출하지 않고 캐시에 저장하고 저장한 행의 수를 반환합니다.
+
+        파일은 chunksize 행씩 나누어 읽기 때문에 파일이 커도 메모리를 많이 사용하지 않습니다.
+        각 행은 캐시와 같은 CACHE_CHUNK_DAYS일 단위의 구간으로 나뉘어 저장되며, 이미 캐시된 날짜는 파일의 값으로 덮어씁니다.
+        날짜 열은 fetch_ohlcv의 결과와 같은 YYYYMMDD 형식이거나 datetime이어야 합니다.
+        파일에 없는 PriceDict의 값(전일 대비 등)은 기본값으로 채워집니다.
+        파일의 첫 날짜 이전이나 마지막 날짜 이후가 포함되어 파일이 일부만 채우는 구간은
+        불완전한 것으로 간주되어 refresh_after가 지나면 API로 다시 불러옵니다.
+
+        Args:
+            company_code: 파일에 종목 코드 열이 없다면 모든 행에 이 종목 코드를 사용합니다.
+            column_names: 파일의 열 이름과 PriceDict의 key(혹은 'company_code')의 대응입니다.
+                INGEST_COLUMN_NAMES에 덮어씌워 사용되며, PriceDict의 key와 이름이 같은 열은 따로 지정하지 않아도 됩니다.
+            chunksize: 한 번에 읽을 행의 수입니다.
+        """
+        column_names = INGEST_COLUMN_NAMES | (column_names or {})
+        first_dates: dict[str, datetime] = {}
+        last_dates: dict[str, datetime] = {}
+        # 파일로 채우기 전에 이미 캐시되어 있던 구간들
+        cached_keys = set(self._cache)
+        ingested_keys: set[tuple[str, int]] = set()
+        ingested_row_count = 0
+
+        for path in paths:
+            for block in _iter_price_file(Path(path), chunksize):
+                prices = block.rename(columns=column_names)
+                if company_code is not None:
+                    prices["company_code"] = company_code
+                elif "company_code" not in prices:
+                    raise ValueError(
+                        f"There's no company code column in {path}. "
+                        "Specify `company_code` or map the column with `column_names`."
+                    )
+                if prices.empty:
+                    continue
+
+                dates = prices["stck_bsop_date"]
+                if not pd.api.types.is_datetime64_any_dtype(dates):
+                    dates = pd.to_datetime(dates.astype(str), format=DATE_FORMAT)
+                if not self._is_standard_day_smartly_defined and not self._cache:
+                    self._standard_day = dates.min().to_pydatetime()
+                    self._is_standard_day_smartly_defined = True
+
+                prices = _normalize_ingested_prices(prices, dates)
+                date_categories = (
+                    dates - pd.Timestamp(self._standard_day)
+                ).dt.days.to_numpy() // CACHE_CHUNK_DAYS
+
+                for (code, date_category), chunk in prices.groupby(
+                    ["company_code", date_categories]
+                ):
+                    self._merge_into_cache(
+                        code, int(date_category), chunk.drop(columns="company_code")
+                    )
+                    ingested_keys.add((code, int(date_category)))
+                code_dates = dates.groupby(prices["company_code"])
+                for code, first_date in code_dates.min().items():
+                    first_date = first_date.to_pydatetime()
+                    first_dates[code] = min(
+                        first_date, first_dates.get(code, first_date)
+                    )
+                for code, last_date in code_dates.max().items():
+                    last_date = last_date.to_pydatetime()
+                    last_dates[code] = max(last_date, last_dates.get(code, last_date))
+                ingested_row_count += len(prices)
+
+        for key in ingested_keys:
+            code, date_category = key
+            chunk_start_day = self._standard_day + timedelta(
+                date_category * CACHE_CHUNK_DAYS
+            )
+            if first_dates[code] > chunk_start_day and key not in cached_keys:
+                # 구간의 앞부분이 비어 있으므로 구간이 시작하기 전에 불러온 것으로 취급해 다시 불러오도록 함.
+                self._fetched_at[key] = chunk_start_day
+            else:
+                # 파일의 마지막 날짜의 다음 날에 불러온 것으로 취급함.
+                self._fetched_at[key] = last_dates[code] + timedelta(1)
+            self._record_revision_date(code, date_category)
+            self._clear_resampled_cache(code)
+
+        if self.cache_prices:
+            self._control_cache_file("store")
+        return ingested_row_count
+
+    def _merge_into_cache(
+        self, company_code: str, date_category: int, prices: pd.DataFrame
+    ) -> None:
+        key = (company_code, date_category)
+        if key in self._cache and not self._cache[key].empty:
+            prices = pd.concat([prices, self._cache[key]], ignore_index=True)
+        self._cache[key] = prices.drop_duplicates(
+            "stck_bsop_date", ignore_index=True
+        ).sort_values("stck_bsop_date", ascending=False, ignore_index=True)
+
     def _before_get_price(self, day: datetime, company_code: str | None) -> str:
         if not self._is_standard_day_smartly_defined and not self._cache:
-            self._standard_day = day - timedelta(50)
+            self._standard_day = day - timedelta(CACHE_CHUNK_DAYS // 2)
             self._is_standard_day_smartly_defined = True
 
         company_code = company_code or self.default_company_code
@@ -148,14 +605,16 @@ class PriceCache:
         if not result.empty:
             return result.squeeze().to_dict()
 
-        return self._find_suit_day(
-            date_direction, nearest_day_threshold, day, company_code
-        )
+        with get_current_profiler().phase("price_cache.find_suit_day"):
+            return self._find_suit_day(
+                date_direction, nearest_day_threshold, day, company_code
+            )
 
     def _find_suit_day(
         self, date_direction, nearest_day_threshold, day, company_code
     ) -> PriceDict:
         def try_get_price_from(day: datetime):
+            get_current_profiler().count("price_cache.find_suit_day_probe")
             try:
                 return_value = self.get_price(
                     day, company_code, nearest_day_threshold=0
@@ -191,25 +650,191 @@ class PriceCache:
             f"and {day + timedelta(day_diff)}."
         )
 
-    # def get_prices_between_range(
-    #     self,
-    #     start_day: datetime,
-    #     end_day: datetime,
-    #     company_code: str | None = None,
-    # ) -> PriceDict:
-    #     company_code = self._before_get_price(start_day, company_code)
+    def get_prices_between_range(
+        self,
+        start_day: datetime,
+        end_day: datetime,
+        company_code: str | None = None,
+    ) -> pd.DataFrame:
+        """start_day부터 end_day 전날까지의 일봉 데이터를 날짜 순으로 정렬된 DataFrame으로 가져옵니다.
+
+        fetch_prices_by_datetime과 마찬가지로 end_day 당일은 포함되지 않습니다.
+        필요한 구간만 fetch하고 나머지는 캐시를 사용합니다.
+        상장 전이나 상장 폐지 후처럼 데이터가 없는 구간은 예외를 내지 않고 비어 있는 것으로 취급합니다.
+        """
+        company_code = self._before_get_price(start_day, company_code)
+
+        start_day_category, _ = self._get_day_category(start_day)
+        end_day_category, _ = self._get_day_category(end_day - timedelta(1))
+
+        chunks = []
+        for date_category in range(start_day_category, end_day_category + 1):
+            try:
+                self._store_cache_of_day(
+                    self._standard_day + timedelta(date_category * CACHE_CHUNK_DAYS),
+                    company_code,
+                )
+            except MojitoInvalidResponseError:
+                # 상장 전이나 상장 폐지 후의 구간에는 데이터가 없으므로 건너뜀.
+                continue
+            chunks.append(self._cache[(company_code, date_category)])
+
+        prices = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        if prices.empty:
+            return pd.DataFrame(columns=list(PriceDict.__annotations__))
+
+        is_in_range = prices["stck_bsop_date"].between(
+            start_day.strftime(DATE_FORMAT),
+            (end_day - timedelta(1)).strftime(DATE_FORMAT),
+        )
+        return prices[is_in_range].sort_values("stck_bsop_date", ignore_index=True)
+
+    @_synchronized
+    def get_prices(
+        self,
+        start_day: datetime,
+        end_day: datetime,
+        company_code: str | None = None,
+        date_type: Literal["D", "W", "M"] | int = "D",
+    ) -> pd.DataFrame:
+        """캐시된 일봉 데이터를 모아 일봉/주봉/월봉/N일봉을 만들어 가져옵니다. end_day 당일은 포함되지 않습니다.
 
-    #     start_day_category, _ = self._get_day_category(start_day)
-    #     end_day_category, _ = self._get_day_category(end_day)
-    #     prices = []
+        주봉과 월봉을 위해 API를 따로 호출하지 않고 캐시된 일봉을 집계하며, 집계된 결과도 캐시됩니다.
 
-    #     curr_day = start_day
-    #     while end_day_category <= self._get_day_category(curr_day)[0]:
-    #         self._store_cache_of_day(curr_day, company_code)
-    #         curr_day += timedelta(100)
+        Args:
+            date_type: 'D'는 일봉, 'W'는 주봉, 'M'은 월봉입니다.
+                정수 N을 넣으면 start_day부터 거래일 N일씩 묶은 N일봉을 만듭니다.
+                주봉과 월봉은 start_day와 end_day가 속한 주/달 전체를 기준으로 집계합니다.
+                각 봉의 stck_bsop_date는 해당 봉의 마지막 거래일입니다.
+        """
+        company_code = self._before_get_price(start_day, company_code)
+
+        if date_type == "D":
+            return self.get_prices_between_range(start_day, end_day, company_code)
+
+        if date_type in {"W", "M"}:
+            start_day = pd.Period(start_day, date_type).start_time.to_pydatetime()
+            end_day = (
+                pd.Period(end_day - timedelta(1), date_type).end_time.normalize()
+                + timedelta(1)
+            ).to_pydatetime()
+        elif not isinstance(date_type, int) or date_type <= 0:
+            raise ValueError(
+                f"date_type should be 'D', 'W', 'M' or positive integer, not {date_type!r}."
+            )
 
-    #     for day in
+        key = (company_code, date_type, start_day, end_day)
+        if key not in self._resampled_cache:
+            self._resampled_cache[key] = _resample_prices(
+                self.get_prices_between_range(start_day, end_day, company_code),
+                date_type,
+            )
+        return self._resampled_cache[key].copy()
+
+
+def _resample_prices(
+    daily_prices: pd.DataFrame, date_type: Literal["W", "M"] | int
+) -> pd.DataFrame:
+    """날짜 순으로 정렬된 일봉 데이터를 주봉/월봉/N일봉으로 집계합니다. 결과값은 일봉과 같이 str로 이루어져 있습니다."""
+    if daily_prices.empty:
+        return daily_prices.copy()
+
+    prices = daily_prices.copy()
+    numeric_columns = [
+        "stck_clpr",
+        "stck_oprc",
+        "stck_hgpr",
+        "stck_lwpr",
+        "acml_vol",
+        "acml_tr_pbmn",
+        "prdy_vrss",
+    ]
+    prices[numeric_columns] = prices[numeric_columns].apply(pd.to_numeric)
+
+    if isinstance(date_type, int):
+        groups = np.arange(len(prices)) // date_type
+    else:
+        groups = pd.to_datetime(
+            prices["stck_bsop_date"], format=DATE_FORMAT
+        ).dt.to_period(date_type)
+
+    resampled = prices.groupby(groups, sort=True).agg(
+        stck_bsop_date=("stck_bsop_date", "last"),
+        stck_clpr=("stck_clpr", "last"),
+        stck_oprc=("stck_oprc", "first"),
+        stck_hgpr=("stck_hgpr", "max"),
+        stck_lwpr=("stck_lwpr", "min"),
+        acml_vol=("acml_vol", "sum"),
+        acml_tr_pbmn=("acml_tr_pbmn", "sum"),
+        flng_cls_code=("flng_cls_code", "last"),
+        prtt_rate=("prtt_rate", "last"),
+        mod_yn=("mod_yn", lambda mod_yn: "Y" if (mod_yn == "Y").any() else "N"),
+        # 일봉의 전일 대비를 모두 더하면 이전 봉의 종가 대비가 됨.
+        prdy_vrss=("prdy_vrss", "sum"),
+        revl_issu_reas=("revl_issu_reas", "last"),
+    )
+    resampled["prdy_vrss_sign"] = np.select(
+        [resampled["prdy_vrss"] > 0, resampled["prdy_vrss"] < 0], ["2", "5"], "3"
+    )
+    return resampled[list(PriceDict.__annotations__)].astype(str).reset_index(drop=True)
+
+
+def _iter_price_file(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    """CSV나 Parquet 파일을 chunksize 행씩 읽습니다."""
+    if path.suffix.lower() == ".csv":
+        with pd.read_csv(path, chunksize=chunksize, dtype=str) as reader:
+            yield from reader
+        return
+
+    if path.suffix.lower() in {".parquet", ".pq"}:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "pyarrow is required to ingest parquet files. Install it with `pip install pyarrow`."
+            ) from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    raise ValueError(f"Unsupported file type: {path}. Use csv or parquet file.")
+
+
+def _normalize_ingested_prices(prices: pd.DataFrame, dates: pd.Series) -> pd.DataFrame:
+    """파일에서 읽은 값들을 fetch_ohlcv의 결과와 같은 형식(모든 값이 str)으로 바꿉니다."""
+    normalized = pd.DataFrame(
+        {
+            "company_code": prices["company_code"].astype(str).str.zfill(6),
+            "stck_bsop_date": dates.dt.strftime(DATE_FORMAT),
+        },
+        index=prices.index,
+    )
+    for key in PriceDict.__annotations__:
+        if key == "stck_bsop_date":
+            continue
+        if key not in prices:
+            if key not in _INGEST_DEFAULT_VALUES:
+                raise ValueError(f"Column for '{key}' is required to ingest prices.")
+            normalized[key] = _INGEST_DEFAULT_VALUES[key]
+        elif key in {
+            *SIGNIFICANT_PRICE_NAMES.values(),
+            "acml_vol",
+            "acml_tr_pbmn",
+            "prdy_vrss",
+        }:
+            # 55500.0과 같은 값도 fetch_ohlcv의 결과처럼 55500으로 바꿈.
+            normalized[key] = (
+                pd.to_numeric(prices[key]).round().astype(np.int64).astype(str)
+            )
+        else:
+            normalized[key] = prices[key].fillna("").astype(str)
+    return normalized
 
-    #     for category in range(start_day_category + 1, end_day_category):
 
-    #     return {}
+def _get_revision_date(prices: pd.DataFrame) -> str:
+    """수정주가 관련 표시(mod_yn, revl_issu_reas)가 있는 마지막 날짜를 반환합니다. 없다면 빈 문자열을 반환합니다."""
+    if prices.empty or "mod_yn" not in prices:
+        return ""
+    is_revised = (prices["mod_yn"] == "Y") | (prices["revl_issu_reas"] != "")
+    return prices.loc[is_revised, "stck_bsop_date"].max() if is_revised.any() else ""
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from collections.abc import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .fetch import DATE_FORMAT
+from .price_cache import PriceCache
+
+# 시작일 이전의 가장 가까운 거래일의 종가로 빈 날을 채우기 위해 미리 불러오는 기간
+LOOKBACK_DAYS = 10
+
+
+@dataclass
+class PriceMatrix:
+    """(날짜 × 종목) 모양의 종가 행렬입니다. 거래가 없는 날은 이전 거래일의 종가로 채워집니다.
+
+    행은 start_day부터 하루씩 증가하는 달력상의 날짜이고, 열은 company_codes의 순서를 따릅니다.
+    값을 알 수 없는 칸은 NaN입니다.
+    """
+
+    start_day: datetime
+    company_codes: list[str]
+    closes: np.ndarray
+    _columns: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._columns = {
+            company_code: column
+            for column, company_code in enumerate(self.company_codes)
+        }
+
+    @classmethod
+    def from_price_cache(
+        cls,
+        price_cache: PriceCache,
+        company_codes: Iterable[str],
+        start_day: datetime,
+        end_day: datetime,
+        spans: Mapping[str, tuple[datetime, datetime]] | None = None,
+    ) -> PriceMatrix:
+        """price_cache에서 종목들의 종가를 불러와 행렬을 만듭니다. start_day와 end_day 모두를 포함합니다.
+
+        spans에 종목별로 필요한 기간(둘 다 포함)이 주어지면 그 기간만 불러오고, 기간 밖의 칸은 NaN으로 둡니다.
+        """
+        company_codes = list(dict.fromkeys(company_codes))
+        spans = spans or {}
+        fetch_start_day = start_day - timedelta(LOOKBACK_DAYS)
+        days = pd.date_range(fetch_start_day, end_day)
+
+        matrix = np.full((len(days), len(company_codes)), np.nan)
+        for column, company_code in enumerate(company_codes):
+            span_start_day, span_end_day = spans.get(company_code, (start_day, end_day))
+            span_start_day = max(span_start_day, start_day)
+            span_end_day = min(span_end_day, end_day)
+            if span_end_day < span_start_day:
+                continue
+
+            prices = price_cache.get_prices_between_range(
+                span_start_day - timedelta(LOOKBACK_DAYS),
+                span_end_day + timedelta(1),
+                company_code,
+            )
+            closes = (
+                pd.Series(
+                    pd.to_numeric(prices["stck_clpr"]).to_numpy(dtype=np.float64),
+                    index=pd.to_datetime(prices["stck_bsop_date"], format=DATE_FORMAT),
+                )
+                .reindex(days)
+                .ffill()
+            )
+            is_in_span = (days >= span_start_day) & (days <= span_end_day)
+            matrix[is_in_span, column] = closes.to_numpy()[is_in_span]
+
+        return cls(start_day, company_codes, matrix[LOOKBACK_DAYS:])
+
+    def get_closes(self, date: datetime, company_codes: list[str]) -> np.ndarray:
+        """date의 종가들을 company_codes 순서대로 반환합니다. 행렬에 없는 날짜나 종목은 NaN이 됩니다."""
+        row = (date - self.start_day).days
+        if not 0 <= row < len(self.closes):
+            return np.full(len(company_codes), np.nan)
+
+        columns = np.fromiter(
+            (self._columns.get(company_code, -1) for company_code in company_codes),
+            dtype=np.intp,
+            count=len(company_codes),
+        )
+        closes = self.closes[row, columns]
+        closes[columns == -1] = np.nan
+        return closes
+
+    def get_closes_between(
+        self, start_day: datetime, end_day: datetime, company_codes: list[str]
+    ) -> np.ndarray:
+        """start_day부터 end_day까지(둘 다 포함)의 종가들을 (날짜 × company_codes) 모양으로 반환합니다.
+
+        행렬에 없는 날짜나 종목은 NaN이 됩니다.
+        """
+        rows = np.arange(
+            (start_day - self.start_day).days, (end_day - self.start_day).days + 1
+        )
+        columns = np.fromiter(
+            (self._columns.get(company_code, -1) for company_code in company_codes),
+            dtype=np.intp,
+            count=len(company_codes),
+        )
+        is_valid_row = (0 <= rows) & (rows < len(self.closes))
+        closes = self.closes[np.where(is_valid_row, rows, 0)[:, None], columns]
+        closes[~is_valid_row, :] = np.nan
+        closes[:, columns == -1] = np.nan
+        return closes
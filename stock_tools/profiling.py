@@ -0,0 +1,147 @@
+from __future__ import annotations
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+import time
+
+import pandas as pd
+
+
+@dataclass
+class ProfileReport:
+    """Profiler가 측정한 결과입니다.
+
+    phases는 단계별 호출 횟수(count)와 누적 시간(total_seconds), 평균 시간(mean_seconds)을,
+    daily는 날짜와 단계별 호출 횟수와 누적 시간을 누적 시간이 긴 순서대로 담습니다.
+    counters는 시간을 재지 않는 사건(캐시 hit/miss 등)의 횟수입니다.
+    """
+
+    phases: pd.DataFrame
+    daily: pd.DataFrame
+    counters: dict[str, int]
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "date", "start_time")
+
+    def __init__(self, profiler: Profiler, name: str, date: datetime | None) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.date = date
+
+    def __enter__(self) -> None:
+        self.start_time = time.perf_counter()
+
+    def __exit__(self, *_) -> None:
+        self.profiler._record(
+            self.name, self.date, time.perf_counter() - self.start_time
+        )
+
+
+class Profiler:
+    """emulate_trade, State, PriceCache의 단계별 호출 횟수와 누적 시간을 측정합니다.
+
+    emulate_trade의 profiler에 넘겨준 후 report()로 결과를 확인할 수 있습니다.
+    여러 번의 emulate_trade에 같은 Profiler를 넘겨주면 결과가 누적됩니다.
+
+    측정하는 단계는 다음과 같습니다.
+        emulate_trade.prepare_transactions: transactions를 변환하고 sell_price를 미리 계산하는 단계
+        emulate_trade.price_matrix: PriceMatrix를 만드는 단계
+        emulate_trade.state: transaction이 없는 날의 State를 만드는 단계
+        emulate_trade.transaction: transaction이 있는 날의 State를 만드는 단계
+        emulate_trade.panic_sell: panic sell이나 trigger로 다음 transaction을 앞당기는 단계
+        emulate_trade.trigger: triggers가 발동되는 날을 찾는 단계
+        emulate_trade.build_result: panic sell이 반영된 transactions_df를 만드는 단계
+        state.sell_price: transaction의 sell_price를 price_cache에서 계산하는 단계
+        state.evaluate_prices: 보유 주식의 평가액을 계산하는 단계
+        price_cache.fetch: 캐시되지 않은 구간을 API로 불러오는 단계
+        price_cache.find_suit_day: 장이 열리지 않은 날 대신 가까운 날을 찾는 단계
+    """
+
+    def __init__(self) -> None:
+        self.counters: defaultdict[str, int] = defaultdict(int)
+        self.call_counts: defaultdict[str, int] = defaultdict(int)
+        self.total_seconds: defaultdict[str, float] = defaultdict(float)
+        self.daily_call_counts: defaultdict[tuple[datetime, str], int] = defaultdict(
+            int
+        )
+        self.daily_total_seconds: defaultdict[
+            tuple[datetime, str], float
+        ] = defaultdict(float)
+
+    def phase(self, name: str, date: datetime | None = None) -> _Phase:
+        """with 문 안의 시간을 name 단계로 측정합니다. date가 주어지면 날짜별로도 누적합니다."""
+        return _Phase(self, name, date)
+
+    def count(self, name: str, increment: int = 1) -> None:
+        self.counters[name] += increment
+
+    def _record(self, name: str, date: datetime | None, seconds: float) -> None:
+        self.call_counts[name] += 1
+        self.total_seconds[name] += seconds
+        if date is not None:
+            self.daily_call_counts[(date, name)] += 1
+            self.daily_total_seconds[(date, name)] += seconds
+
+    def report(self) -> ProfileReport:
+        phases = pd.DataFrame(
+            {
+                "phase": list(self.call_counts),
+                "count": list(self.call_counts.values()),
+                "total_seconds": [
+                    self.total_seconds[name] for name in self.call_counts
+                ],
+            }
+        )
+        phases["mean_seconds"] = phases["total_seconds"] / phases["count"]
+        daily = pd.DataFrame(
+            [
+                (date, name, count, self.daily_total_seconds[(date, name)])
+                for (date, name), count in self.daily_call_counts.items()
+            ],
+            columns=["date", "phase", "count", "total_seconds"],
+        )
+        return ProfileReport(
+            phases.sort_values("total_seconds", ascending=False, ignore_index=True),
+            daily.sort_values("total_seconds", ascending=False, ignore_index=True),
+            dict(self.counters),
+        )
+
+
+class _DisabledProfiler(Profiler):
+    """아무것도 측정하지 않는 Profiler입니다. profiler가 주어지지 않았을 때 사용됩니다."""
+
+    _null_phase = nullcontext()
+
+    def phase(self, name: str, date: datetime | None = None) -> nullcontext:
+        return self._null_phase
+
+    def count(self, name: str, increment: int = 1) -> None:
+        pass
+
+
+DISABLED_PROFILER = _DisabledProfiler()
+
+# PriceCache처럼 profiler를 인자로 받지 않는 곳에서 지금 실행 중인 emulate_trade의 Profiler를 찾기 위함.
+# 값은 thread마다 따로 관리되므로 여러 thread에서 같은 PriceCache로 동시에 실행해도 측정 결과가 섞이지 않음.
+_current_profiler: ContextVar[Profiler] = ContextVar(
+    "current_profiler", default=DISABLED_PROFILER
+)
+
+
+def get_current_profiler() -> Profiler:
+    """use_profiler로 설정된 Profiler를 반환합니다. 설정되지 않았다면 DISABLED_PROFILER를 반환합니다."""
+    return _current_profiler.get()
+
+
+@contextmanager
+def use_profiler(profiler: Profiler) -> Iterator[None]:
+    """with 문 안에서 get_current_profiler가 profiler를 반환하도록 합니다."""
+    token = _current_profiler.set(profiler)
+    try:
+        yield
+    finally:
+        _current_profiler.reset(token)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from collections.abc import Iterable
+import logging
+import threading
+import time
+
+import mojito
+
+from .exceptions import MojitoInvalidResponseError
+from .key import KEY
+from .rate_limit import DEFAULT_RATE_LIMITER, Priority, RateLimiter
+
+
+@dataclass(frozen=True)
+class _CachedQuote:
+    quote: dict
+    fetched_at: float
+
+
+class QuoteCache:
+    """broker.fetch_price로 불러온 현재가를 종목별 TTL(초) 동안 메모리에 보관하는 클래스입니다.
+
+    PriceCache가 일봉을 캐싱한다면 QuoteCache는 장중의 현재가를 캐싱합니다.
+    TTL이 지나지 않은 요청은 메모리에서 바로 반환하고, TTL이 지난 값은 일단 반환한 후 background에서 새로 불러옵니다.
+    같은 종목을 동시에 요청하더라도 API는 한 번만 호출되며, 모든 요청은 rate_limiter를 거칩니다.
+    """
+
+    def __init__(
+        self,
+        broker: mojito.KoreaInvestment,
+        ttl: float = 3.0,
+        rate_limiter: RateLimiter | None = None,
+        max_workers: int = 8,
+    ) -> None:
+        """rate_limiter가 None이라면 submit_orders 등과 공유하는 기본 RequestScheduler를 사용합니다."""
+        self.broker = broker
+        self.ttl = ttl
+        self.ttls: dict[str, float] = {}
+        self.rate_limiter = rate_limiter or DEFAULT_RATE_LIMITER
+        self._quotes: dict[str, _CachedQuote] = {}
+        self._pending: dict[str, Future[dict]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers)
+
+    @classmethod
+    def from_keys_json(cls, ttl: float = 3.0) -> QuoteCache:
+        return cls(mojito.KoreaInvestment(**KEY), ttl)
+
+    def set_ttl(self, company_code: str, ttl: float) -> None:
+        """특정 종목의 TTL을 따로 설정합니다."""
+        self.ttls[company_code] = ttl
+
+    def _is_fresh(self, company_code: str, cached_quote: _CachedQuote) -> bool:
+        ttl = self.ttls.get(company_code, self.ttl)
+        return time.monotonic() - cached_quote.fetched_at < ttl
+
+    def _fetch_quote(self, company_code: str) -> dict:
+        try:
+            self.rate_limiter.acquire(Priority.QUOTE, company_code)
+            response = self.broker.fetch_price(company_code)
+            if "output" not in response:
+                raise MojitoInvalidResponseError(
+                    f"Current price is not fetched properly. response: {response}"
+                )
+            quote = response["output"]
+            with self._lock:
+                self._quotes[company_code] = _CachedQuote(quote, time.monotonic())
+            return quote
+        finally:
+            with self._lock:
+                del self._pending[company_code]
+
+    def _request_refresh(self, company_code: str) -> Future[dict]:
+        """이미 같은 종목을 불러오는 중이라면 새로 요청하지 않고 그 Future를 반환합니다."""
+        with self._lock:
+            if company_code not in self._pending:
+                self._pending[company_code] = self._executor.submit(
+                    self._fetch_quote, company_code
+                )
+            return self._pending[company_code]
+
+    def get_quote(self, company_code: str) -> dict:
+        """종목의 현재가 정보(broker.fetch_price의 output)를 가져옵니다."""
+        with self._lock:
+            cached_quote = self._quotes.get(company_code)
+
+        if cached_quote is None:
+            return self._request_refresh(company_code).result()
+
+        if not self._is_fresh(company_code, cached_quote):
+            self._request_refresh(company_code).add_done_callback(
+                _log_background_error
+            )
+        return cached_quote.quote
+
+    def get_price(self, company_code: str) -> int:
+        """종목의 현재가를 가져옵니다."""
+        return int(self.get_quote(company_code)["stck_prpr"])
+
+    def refresh(
+        self, company_codes: Iterable[str], force: bool = False
+    ) -> dict[str, dict]:
+        """여러 종목의 현재가를 동시에 불러오고 모두 불러올 때까지 기다립니다.
+
+        force가 False라면 TTL이 지나지 않은 종목은 다시 불러오지 않습니다.
+        """
+        futures: dict[str, Future[dict]] = {}
+        quotes: dict[str, dict] = {}
+        for company_code in company_codes:
+            with self._lock:
+                cached_quote = self._quotes.get(company_code)
+            if (
+                not force
+                and cached_quote is not None
+                and self._is_fresh(company_code, cached_quote)
+            ):
+                quotes[company_code] = cached_quote.quote
+            else:
+                futures[company_code] = self._request_refresh(company_code)
+
+        for company_code, future in futures.items():
+            quotes[company_code] = future.result()
+        return quotes
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> QuoteCache:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def _log_background_error(future: Future[dict]) -> None:
+    if (error := future.exception()) is not None:
+        logging.warning(f"Failed to refresh quote in background: {error}")
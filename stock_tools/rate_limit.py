@@ -0,0 +1,200 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+import threading
+import time
+
+# 한국투자증권 실전투자 계좌의 초당 거래건수 제한
+DEFAULT_REQUESTS_PER_SECOND = 20
+
+
+class Priority(IntEnum):
+    """broker 요청의 우선순위입니다. 값이 작을수록 먼저 처리됩니다."""
+
+    ORDER = 0
+    QUOTE = 1
+    BACKFILL = 2
+
+
+class RateLimiter:
+    """초당 요청 수를 제한하는 thread-safe한 token bucket입니다.
+
+    같은 broker를 사용하는 모든 곳에서 하나의 RateLimiter를 공유해야 제한이 제대로 지켜집니다.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int | None = None,
+    ) -> None:
+        """burst는 한 번에 몰아서 보낼 수 있는 최대 요청 수입니다. None이라면 requests_per_second와 같습니다."""
+        if requests_per_second <= 0:
+            raise ValueError("`requests_per_second` should be positive.")
+
+        self.requests_per_second = requests_per_second
+        self.burst = burst or max(1, int(requests_per_second))
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._last_refill) * self.requests_per_second,
+        )
+        self._last_refill = now
+
+    def try_acquire(
+        self, priority: Priority = Priority.BACKFILL, key: str | None = None
+    ) -> bool:
+        """요청을 보낼 수 있다면 token을 사용하고 True를, 아니라면 기다리지 않고 False를 반환합니다."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(
+        self, priority: Priority = Priority.BACKFILL, key: str | None = None
+    ) -> None:
+        """요청을 보낼 수 있을 때까지 기다린 후 token을 사용합니다.
+
+        RateLimiter는 요청을 구분하지 않으므로 priority와 key는 무시됩니다. RequestScheduler와 같은 방식으로 호출하기 위함입니다.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.requests_per_second
+            time.sleep(wait_time)
+
+
+@dataclass
+class _Ticket:
+    priority: Priority
+    key: str | None
+    enqueued_at: float
+
+
+@dataclass
+class SchedulerMetrics:
+    """RequestScheduler의 우선순위별 상태입니다. 모든 dict의 key는 Priority의 이름입니다.
+
+    queue_depths는 현재 기다리고 있는 요청 수, granted_counts는 지금까지 처리된 요청 수,
+    total_wait_seconds와 max_wait_seconds는 처리된 요청들이 기다린 시간의 합과 최댓값입니다.
+    """
+
+    queue_depths: dict[str, int]
+    granted_counts: dict[str, int]
+    total_wait_seconds: dict[str, float]
+    max_wait_seconds: dict[str, float]
+
+
+class RequestScheduler(RateLimiter):
+    """모든 broker 요청이 거쳐 가는 우선순위 기반의 thread-safe한 token bucket입니다.
+
+    token이 생기면 기다리는 요청 중 우선순위가 가장 높은(Priority의 값이 가장 작은) 요청부터 처리합니다.
+    따라서 많은 양의 과거 데이터를 불러오는 중이더라도 주문은 다음 token에서 바로 처리됩니다.
+    같은 우선순위 안에서는 key(종목 코드 등)별로 돌아가며 처리하기 때문에 한 종목이 대기열을 독차지하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int | None = None,
+    ) -> None:
+        super().__init__(requests_per_second, burst)
+        self._condition = threading.Condition(self._lock)
+        # 우선순위별로 key마다의 대기열을 가짐. dict의 순서가 key를 돌아가며 처리하는 순서임.
+        self._queues: dict[Priority, dict[str | None, deque[_Ticket]]] = {
+            priority: {} for priority in Priority
+        }
+        self._granted_counts = {priority: 0 for priority in Priority}
+        self._total_wait_seconds = {priority: 0.0 for priority in Priority}
+        self._max_wait_seconds = {priority: 0.0 for priority in Priority}
+
+    def _next_ticket(self) -> _Ticket | None:
+        for queue in self._queues.values():
+            if queue:
+                return next(iter(queue.values()))[0]
+        return None
+
+    def _grant(self, ticket: _Ticket) -> None:
+        self._tokens -= 1
+        queue = self._queues[ticket.priority]
+        tickets = queue.pop(ticket.key)
+        tickets.popleft()
+        if tickets:
+            # 같은 key의 다음 요청은 다른 key들의 뒤로 보냄.
+            queue[ticket.key] = tickets
+
+        wait_seconds = time.monotonic() - ticket.enqueued_at
+        self._granted_counts[ticket.priority] += 1
+        self._total_wait_seconds[ticket.priority] += wait_seconds
+        self._max_wait_seconds[ticket.priority] = max(
+            wait_seconds, self._max_wait_seconds[ticket.priority]
+        )
+        self._condition.notify_all()
+
+    def try_acquire(
+        self, priority: Priority = Priority.BACKFILL, key: str | None = None
+    ) -> bool:
+        """기다리는 요청이 없고 token이 있다면 바로 token을 사용하고 True를, 아니라면 False를 반환합니다."""
+        with self._condition:
+            self._refill()
+            if self._next_ticket() is not None or self._tokens < 1:
+                return False
+            ticket = _Ticket(priority, key, time.monotonic())
+            self._queues[priority][key] = deque([ticket])
+            self._grant(ticket)
+            return True
+
+    def acquire(
+        self, priority: Priority = Priority.BACKFILL, key: str | None = None
+    ) -> None:
+        """요청의 차례가 오고 token이 생길 때까지 기다린 후 token을 사용합니다."""
+        ticket = _Ticket(priority, key, time.monotonic())
+        with self._condition:
+            self._queues[priority].setdefault(key, deque()).append(ticket)
+            while True:
+                self._refill()
+                is_next = self._next_ticket() is ticket
+                if is_next and self._tokens >= 1:
+                    self._grant(ticket)
+                    return
+                # 차례가 아니라면 다른 요청이 처리될 때까지, 차례라면 다음 token이 생길 때까지 기다림.
+                self._condition.wait(
+                    (1 - self._tokens) / self.requests_per_second if is_next else None
+                )
+
+    def metrics(self) -> SchedulerMetrics:
+        with self._condition:
+            return SchedulerMetrics(
+                {
+                    priority.name: sum(len(tickets) for tickets in queue.values())
+                    for priority, queue in self._queues.items()
+                },
+                {
+                    priority.name: count
+                    for priority, count in self._granted_counts.items()
+                },
+                {
+                    priority.name: seconds
+                    for priority, seconds in self._total_wait_seconds.items()
+                },
+                {
+                    priority.name: seconds
+                    for priority, seconds in self._max_wait_seconds.items()
+                },
+            )
+
+
+# broker를 사용하는 모든 함수(주문, 현재가, 과거 데이터)가 기본으로 공유하는 scheduler
+DEFAULT_SCHEDULER = RequestScheduler()
+# 예전 이름. DEFAULT_SCHEDULER와 같은 객체임.
+DEFAULT_RATE_LIMITER = DEFAULT_SCHEDULER
@@ -0,0 +1,194 @@
+from __future__ import annotations
+from contextlib import suppress
+from datetime import datetime, timedelta
+from os import PathLike
+from pathlib import Path
+from typing import Any
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from .price_cache import PriceCache
+from .price_matrix import LOOKBACK_DAYS
+from .transaction_and_state import INITIAL_STATE, State, Transaction, TransactionBatch
+from .triggers import Trigger
+
+# 저장 형식이나 emulate_trade의 계산 방식이 바뀌면 값을 올려 이전 결과를 모두 무효화함.
+RESULT_CACHE_VERSION = 1
+
+
+class EmulationResultCache:
+    """emulate_trade의 결과를 입력값과 가격 데이터의 버전으로 만든 hash를 이름으로 하는 파일에 저장합니다.
+
+    emulate_trade의 result_cache에 넘겨주면 같은 입력값으로 다시 실행할 때 계산하지 않고 저장된 결과를 불러옵니다.
+    거래되는 종목의 캐시 구간을 다시 불러오거나(refresh, ingest_files 등) 다시 불러와야 하는 구간이 있다면
+    가격 데이터의 버전이 달라지므로 자동으로 다시 계산합니다.
+
+    파일의 총 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 결과부터 삭제합니다.
+    """
+
+    def __init__(
+        self,
+        directory: str | PathLike = PriceCache.cache_directory / "emulate_trade",
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _get_path(self, key: str) -> Path:
+        return self.directory / f"{key}.pickle"
+
+    def get(self, key: str) -> Any | None:
+        """저장된 결과를 반환합니다. 저장된 결과가 없다면 None을 반환합니다."""
+        path = self._get_path(key)
+        try:
+            result = pickle.loads(path.read_bytes())
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        # 가장 오래 사용하지 않은 결과부터 삭제할 수 있도록 사용한 시간을 기록함.
+        # 그 사이 다른 process가 파일을 삭제했거나 읽기 전용이더라도 불러온 결과는 그대로 사용함.
+        with suppress(OSError):
+            os.utime(path)
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Any) -> None:
+        self.directory.mkdir(exist_ok=True, parents=True)
+        path = self._get_path(key)
+        # 쓰는 도중에 다른 process가 읽지 않도록 임시 파일에 쓴 후 이름을 바꿈.
+        temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary_path.write_bytes(pickle.dumps(result))
+        temporary_path.replace(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        files = []
+        for path in self.directory.glob("*.pickle"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.pickle"):
+            path.unlink(missing_ok=True)
+
+    def make_key(
+        self,
+        price_cache: PriceCache,
+        transactions: list[Transaction] | pd.DataFrame | TransactionBatch,
+        initial_state: State | None,
+        final_date: datetime | None,
+        only_if_transaction_exists: bool,
+        commission: tuple[float, float] | None,
+        panic_sell_rate: float | None,
+        use_price_matrix: bool,
+        triggers: list[Trigger] | None,
+    ) -> str | None:
+        """입력값과 가격 데이터의 버전으로 key를 만듭니다. 다시 불러와야 하는 캐시 구간이 있다면 None을 반환합니다."""
+        if isinstance(transactions, TransactionBatch):
+            # sell_price를 계산하기 전과 후의 TransactionBatch가 같은 key가 되도록 계산된 값으로 hash함.
+            # 계산에 필요한 구간을 불러올 수 있으므로 chunk_versions보다 먼저 계산해야 함.
+            transactions = transactions.evaluate_sell_prices(price_cache)
+        company_codes, dates = _get_company_codes_and_dates(transactions)
+        company_codes.update((initial_state or INITIAL_STATE).stocks)
+        if initial_state is not None and initial_state is not INITIAL_STATE:
+            dates.append(initial_state.date)
+        if final_date is not None:
+            dates.append(final_date)
+        if not dates:
+            return None
+
+        chunk_versions = price_cache._get_chunk_versions(
+            company_codes, min(dates) - timedelta(LOOKBACK_DAYS), max(dates)
+        )
+        if chunk_versions is None:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(_hash_transactions(transactions))
+        digest.update(
+            repr(
+                (
+                    RESULT_CACHE_VERSION,
+                    initial_state,
+                    final_date,
+                    only_if_transaction_exists,
+                    commission,
+                    panic_sell_rate,
+                    use_price_matrix,
+                    triggers,
+                    chunk_versions,
+                )
+            ).encode()
+        )
+        return digest.hexdigest()
+
+
+def _get_company_codes_and_dates(
+    transactions: list[Transaction] | pd.DataFrame | TransactionBatch,
+) -> tuple[set[str], list[datetime]]:
+    if isinstance(transactions, TransactionBatch):
+        if not len(transactions.dates):
+            return set(), []
+        return set(transactions.company_codes.tolist()), [
+            pd.Timestamp(transactions.dates.min()).to_pydatetime(),
+            pd.Timestamp(transactions.dates.max()).to_pydatetime(),
+        ]
+
+    if isinstance(transactions, pd.DataFrame):
+        if transactions.empty:
+            return set(), []
+        # emulate_trade와 마찬가지로 열의 순서가 Transaction의 field 순서와 같다고 가정함.
+        dates = pd.to_datetime(transactions.iloc[:, 0])
+        return set(transactions.iloc[:, 1].astype(str)), [
+            dates.min().to_pydatetime(),
+            dates.max().to_pydatetime(),
+        ]
+
+    return {transaction.company_code for transaction in transactions}, [
+        transaction.date for transaction in transactions
+    ]
+
+
+def _hash_transactions(
+    transactions: list[Transaction] | pd.DataFrame | TransactionBatch,
+) -> bytes:
+    digest = hashlib.sha256()
+    if isinstance(transactions, TransactionBatch):
+        # make_key에서 sell_price가 모두 계산된 TransactionBatch만 넘어옴.
+        for array in (
+            transactions.dates.astype("datetime64[ns]").view(np.int64),
+            transactions.amounts.astype(np.int64),
+            transactions.sell_prices.astype(np.int64),
+        ):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(
+            "\0".join(transactions.company_codes.astype(str).tolist()).encode()
+        )
+    elif isinstance(transactions, pd.DataFrame):
+        digest.update(
+            repr(
+                (
+                    list(transactions.columns),
+                    list(transactions.itertuples(index=False, name=None)),
+                )
+            ).encode()
+        )
+    else:
+        digest.update(repr(transactions).encode())
+    return digest.digest()
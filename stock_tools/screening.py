@@ -0,0 +1,251 @@
+"""여러 종목의 일봉을 한 번에 불러와 날짜별로 종목들을 비교하는 지표를 계산하고 순위를 매깁니다."""
+
+from __future__ import annotations
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+import logging
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .exceptions import MojitoInvalidResponseError
+from .fetch import DATE_FORMAT, SIGNIFICANT_PRICE_NAMES
+from .price_cache import PriceCache
+from .trading_calendar import get_trading_days
+
+FEATURE_NAMES = ("return", "volatility", "volume_surge", "gap")
+
+
+def screen_universe(
+    price_cache: PriceCache,
+    company_codes: Iterable[str],
+    start_day: datetime,
+    end_day: datetime,
+    top_k: int = 20,
+    features: Iterable[str] = FEATURE_NAMES,
+    return_days: int = 20,
+    volatility_days: int = 20,
+    volume_days: int = 20,
+    ascending: bool = False,
+    block_size: int = 200,
+) -> pd.DataFrame:
+    """company_codes 전체에서 start_day부터 end_day 전날까지 매 거래일마다 지표별 상위 top_k개의 종목을 찾습니다.
+
+    종목들은 block_size개씩 나눠 (거래일 × 종목) 행렬로 불러오고 지표는 행렬 전체에 대해 한 번에 계산합니다.
+    각 block의 결과는 지금까지의 상위 top_k개와 합쳐 다시 top_k개만 남기기 때문에
+    종목이 아무리 많아도 메모리는 block_size와 top_k에만 비례합니다.
+    상장 전이나 상장 폐지 후, 거래 정지, 달력에 없는 휴장일처럼 데이터가 없는 날은 거래되지 않은 날로 취급하며,
+    데이터를 불러올 수 없는 종목은 건너뜁니다. 아래의 거래일은 종목마다 실제로 거래된 날만 셉니다.
+
+    지표는 다음과 같습니다. 그 날 거래되지 않았거나 계산에 필요한 과거 데이터가 부족한 종목은 제외됩니다.
+        return: return_days 거래일 전 종가 대비 수익률입니다.
+        volatility: 최근 volatility_days 거래일의 일간 로그 수익률의 표준편차입니다.
+        volume_surge: 그 날의 거래량을 직전 volume_days 거래일의 평균 거래량으로 나눈 값입니다.
+        gap: 전 거래일 종가 대비 시가의 변화율입니다.
+
+    Args:
+        features: 계산할 지표들입니다. FEATURE_NAMES 중에서 고를 수 있습니다.
+        ascending: False라면(기본값) 값이 큰 종목부터, True라면 값이 작은 종목부터 순위를 매깁니다.
+        block_size: 한 번에 불러와 계산할 종목의 수입니다.
+
+    Returns:
+        date, feature, rank(1부터 시작), company_code, value 열을 가지고 date, feature, rank 순으로 정렬된 DataFrame입니다.
+    """
+    features = list(features)
+    unknown_features = set(features) - set(FEATURE_NAMES)
+    if unknown_features:
+        raise ValueError(f"Unknown features: {sorted(unknown_features)}")
+    if top_k <= 0 or block_size <= 0:
+        raise ValueError("`top_k` and `block_size` should be positive.")
+
+    company_codes = np.array(list(dict.fromkeys(company_codes)), dtype=str)
+    # 주말과 휴장일을 감안해 가장 긴 기간의 거래일보다 넉넉하게 불러옴.
+    lookback_days = max(return_days, volatility_days, volume_days) * 3 // 2 + 14
+    days = get_trading_days(start_day - timedelta(lookback_days), end_day)
+    first_row = int(np.searchsorted(days, np.datetime64(start_day.date())))
+
+    # 지표마다 지금까지의 상위 top_k개의 값과 종목의 위치. 값이 없으면 NaN과 -1임.
+    best_values = {
+        feature: np.full((len(days) - first_row, top_k), np.nan) for feature in features
+    }
+    best_columns = {
+        feature: np.full((len(days) - first_row, top_k), -1) for feature in features
+    }
+    for block_start in range(0, len(company_codes), block_size):
+        block_codes = company_codes[block_start : block_start + block_size]
+        panel = _load_panel(price_cache, block_codes, days)
+        block_features = _compute_features(
+            panel, features, return_days, volatility_days, volume_days
+        )
+        for feature, values in block_features.items():
+            best_values[feature], best_columns[feature] = _merge_top_k(
+                best_values[feature],
+                best_columns[feature],
+                values[first_row:],
+                np.arange(block_start, block_start + len(block_codes)),
+                top_k,
+                ascending,
+            )
+
+    rankings = []
+    for feature in features:
+        rows, ranks = np.nonzero(best_columns[feature] >= 0)
+        rankings.append(
+            pd.DataFrame(
+                {
+                    "date": pd.DatetimeIndex(days[first_row:][rows]),
+                    "feature": feature,
+                    "rank": ranks + 1,
+                    "company_code": company_codes[best_columns[feature][rows, ranks]],
+                    "value": best_values[feature][rows, ranks],
+                }
+            )
+        )
+    return pd.concat(rankings, ignore_index=True).sort_values(
+        ["date", "feature", "rank"], ignore_index=True
+    )
+
+
+def _load_panel(
+    price_cache: PriceCache, company_codes: np.ndarray, days: np.ndarray
+) -> dict[str, np.ndarray]:
+    """days × company_codes 모양의 시가, 종가, 거래량 행렬을 만듭니다. 거래되지 않은 날은 NaN입니다.
+
+    데이터를 불러올 수 없는 종목은 경고를 남기고 모든 날을 NaN으로 둡니다.
+    """
+    price_keys = {
+        "open": SIGNIFICANT_PRICE_NAMES["open"],
+        "close": SIGNIFICANT_PRICE_NAMES["close"],
+        "volume": "acml_vol",
+    }
+    panel = {
+        name: np.full((len(days), len(company_codes)), np.nan) for name in price_keys
+    }
+    if not len(days):
+        return panel
+
+    start_day = pd.Timestamp(days[0]).to_pydatetime()
+    end_day = pd.Timestamp(days[-1]).to_pydatetime() + timedelta(1)
+    for column, company_code in enumerate(company_codes.tolist()):
+        try:
+            prices = price_cache.get_prices_between_range(
+                start_day, end_day, company_code
+            )
+        except MojitoInvalidResponseError as e:
+            # 한 종목 때문에 전체 screening이 멈추지 않도록 건너뜀.
+            logging.warning(f"Failed to load prices of {company_code}: {e}")
+            continue
+        if prices.empty:
+            # 상장 전이나 상장 폐지 후처럼 기간 전체에 데이터가 없는 종목
+            continue
+        price_days = pd.to_datetime(
+            prices["stck_bsop_date"], format=DATE_FORMAT
+        ).to_numpy(dtype="datetime64[D]")
+        rows = np.searchsorted(days, price_days)
+        # 거래일로 알려지지 않은 날의 데이터는 버림.
+        is_known = (rows < len(days)) & (
+            days[np.minimum(rows, len(days) - 1)] == price_days
+        )
+        for name, key in price_keys.items():
+            panel[name][rows[is_known], column] = pd.to_numeric(prices[key]).to_numpy(
+                dtype=np.float64
+            )[is_known]
+    return panel
+
+
+def _compute_features(
+    panel: dict[str, np.ndarray],
+    features: list[str],
+    return_days: int,
+    volatility_days: int,
+    volume_days: int,
+) -> dict[str, np.ndarray]:
+    """거래일 × 종목 행렬로 지표들을 계산합니다. 계산할 수 없는 값은 NaN입니다.
+
+    달력에 없는 휴장일이나 거래 정지로 비어 있는 행은 건너뛰고, 종목마다 실제로 거래된 날만 이어 붙여
+    거래일 수를 셉니다. 그래서 빈 행이 있어도 rolling 지표가 NaN이 되거나 가짜 0 수익률이 끼어들지 않습니다.
+    """
+    is_traded = ~np.isnan(panel["close"])
+    # 종목마다 거래된 행을 위로 모음. 거래되지 않은 행은 아래쪽의 NaN이 됨.
+    order = np.argsort(~is_traded, axis=0, kind="stable")
+    sessions = {
+        name: np.where(
+            np.take_along_axis(is_traded, order, axis=0),
+            np.take_along_axis(values, order, axis=0),
+            np.nan,
+        )
+        for name, values in panel.items()
+    }
+    closes = sessions["close"]
+    previous_closes = _shift(closes, 1)
+
+    result = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "return" in features:
+            result["return"] = closes / _shift(closes, return_days) - 1
+        if "volatility" in features:
+            log_returns = np.log(closes / previous_closes)
+            result["volatility"] = _rolling(log_returns, volatility_days, "std")
+        if "volume_surge" in features:
+            volumes = sessions["volume"]
+            result["volume_surge"] = volumes / _shift(
+                _rolling(volumes, volume_days, "mean"), 1
+            )
+        if "gap" in features:
+            result["gap"] = sessions["open"] / previous_closes - 1
+
+    for feature, values in result.items():
+        values[~np.isfinite(values)] = np.nan
+        # 원래의 행으로 되돌림.
+        restored = np.full(values.shape, np.nan)
+        np.put_along_axis(restored, order, values, axis=0)
+        restored[~is_traded] = np.nan
+        result[feature] = restored
+    return result
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """행을 periods만큼 아래로 밀고 빈 행은 NaN으로 채웁니다."""
+    shifted = np.full(values.shape, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[: len(values) - periods]
+    return shifted
+
+
+def _rolling(values: np.ndarray, window: int, kind: str) -> np.ndarray:
+    """각 행까지의 window개 행의 평균이나 표준편차를 계산합니다. 앞쪽의 window - 1개 행은 NaN입니다."""
+    result = np.full(values.shape, np.nan)
+    if window > len(values):
+        return result
+    windows = sliding_window_view(values, window, axis=0)
+    result[window - 1 :] = (
+        windows.mean(axis=-1) if kind == "mean" else windows.std(axis=-1, ddof=1)
+    )
+    return result
+
+
+def _merge_top_k(
+    best_values: np.ndarray,
+    best_columns: np.ndarray,
+    values: np.ndarray,
+    columns: np.ndarray,
+    top_k: int,
+    ascending: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """지금까지의 상위 top_k개와 새로운 block의 값들을 합쳐 날짜별로 다시 상위 top_k개를 고릅니다."""
+    candidate_values = np.concatenate([best_values, values], axis=1)
+    candidate_columns = np.concatenate(
+        [best_columns, np.broadcast_to(columns, values.shape)], axis=1
+    )
+    # NaN은 항상 마지막 순위가 되도록 함.
+    sort_keys = np.where(
+        np.isnan(candidate_values),
+        np.inf,
+        candidate_values if ascending else -candidate_values,
+    )
+    order = np.argsort(sort_keys, axis=1, kind="stable")[:, :top_k]
+    merged_values = np.take_along_axis(candidate_values, order, axis=1)
+    merged_columns = np.take_along_axis(candidate_columns, order, axis=1)
+    merged_columns[np.isnan(merged_values)] = -1
+    return merged_values, merged_columns
@@ -0,0 +1,213 @@
+"""(날짜 × 종목) 모양의 시그널이나 목표 비중을 emulate_trade에 넘길 수 있는 TransactionBatch로 변환합니다."""
+
+from __future__ import annotations
+from datetime import timedelta
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from .adjust_price import adjust_price_units
+from .fetch import DATE_FORMAT, SIGNIFICANT_PRICE_NAMES
+from .price_cache import PriceCache
+from .price_matrix import LOOKBACK_DAYS
+from .transaction_and_state import TransactionBatch
+
+
+def compile_signals(
+    price_cache: PriceCache,
+    signals: pd.DataFrame,
+    budget: int,
+    price_type: Literal["open", "close"] = "close",
+    slippage: float = 0.0,
+    rebalance: bool = False,
+    initial_stocks: dict[str, int] | None = None,
+) -> TransactionBatch:
+    """시그널이나 목표 비중으로부터 매일 예산에 맞춰 주문 수량을 계산하고 TransactionBatch로 반환합니다.
+
+    종목 간 계산은 모두 numpy 배열로 이루어지며, 날짜별로는 이전 날의 예산과 보유 수량을 이어받습니다.
+    같은 날에는 매도가 매수보다 먼저 오고, 예산이 부족하면 매수 수량을 비율에 맞게 줄이기 때문에
+    예산과 보유 수량은 음수가 되지 않습니다.
+
+    Args:
+        signals: index는 날짜, columns는 종목 코드인 DataFrame입니다.
+            값이 bool이라면 그 날 True인 종목들에 같은 비중을 두고, 숫자라면 총 평가액 대비 목표 비중으로 사용합니다.
+            비중은 음수일 수 없고 날짜별 합은 1 이하여야 하며, NaN은 0으로 취급합니다.
+        budget: 시작 예산입니다.
+        price_type: 주문 가격의 기준입니다. 장이 쉬는 날은 가장 가까운 과거의 가격을 사용합니다.
+        slippage: 매수는 기준 가격보다 slippage만큼 비싸게, 매도는 싸게 주문합니다.
+            가격은 호가 단위에 맞춰지고(매수는 올림, 매도는 내림) 그 날의 고가와 저가를 벗어나지 않습니다.
+        rebalance: False라면(기본값) 시그널이 바뀐 종목만 거래해 매수와 매도가 반복되는 시그널 방식의 transaction을 만듭니다.
+            bool 시그널은 새로 True가 된 종목을 그 날의 같은 비중만큼 사고 False가 된 종목을 모두 팔며,
+            다른 종목이 들어오거나 나가서 같은 비중이 바뀌더라도 계속 True인 종목의 수량은 바꾸지 않습니다.
+            숫자 비중은 비중이 바뀐 종목만 목표 비중에 맞춥니다.
+            거래할 수 없는 날이거나 예산이 부족해 사지 못한 종목은 다음 날에 다시 시도합니다.
+            panic_sell_rate나 triggers를 사용하려면 False여야 합니다.
+            True라면 매일 모든 종목을 목표 비중에 맞춰 다시 조정합니다.
+        initial_stocks: 처음부터 가지고 있던 종목별 수량입니다.
+
+    Returns:
+        가격이 모두 정수로 정해진 TransactionBatch입니다.
+    """
+    if not 0 <= slippage < 1:
+        raise ValueError("`slippage` should be between 0 and 1.")
+
+    company_codes = [str(company_code) for company_code in signals.columns]
+    dates = pd.DatetimeIndex(signals.index)
+    weights = _to_weights(signals)
+    # 거래할 종목을 고르는 기준. bool 시그널은 같은 비중이 아니라 True/False가 바뀐 종목만 거래함.
+    states = (
+        signals.to_numpy(dtype=np.float64)
+        if (signals.dtypes == bool).all()
+        else weights
+    )
+
+    initial_stocks = initial_stocks or {}
+    # 처음 비중이 생기기 전(상장 전 등)에는 거래하지 않으므로 가격을 불러오지 않음.
+    is_initially_held = np.array(
+        [initial_stocks.get(company_code, 0) > 0 for company_code in company_codes],
+        dtype=bool,
+    )
+    is_weighted = weights > 0
+    first_rows = np.where(
+        is_weighted.any(axis=0), is_weighted.argmax(axis=0), len(dates)
+    )
+    first_rows[is_initially_held] = 0
+
+    prices = _get_price_matrices(
+        price_cache,
+        company_codes,
+        dates,
+        SIGNIFICANT_PRICE_NAMES[price_type],
+        first_rows,
+    )
+    is_tradable = ~np.isnan(prices["base"])
+    buy_prices = _adjust_prices(prices["base"] * (1 + slippage), "ceil")
+    buy_prices = np.fmin(buy_prices, prices["high"])
+    sell_prices = _adjust_prices(prices["base"] * (1 - slippage), "floor")
+    sell_prices = np.fmax(sell_prices, prices["low"])
+
+    holdings = np.array(
+        [initial_stocks.get(company_code, 0) for company_code in company_codes],
+        dtype=np.int64,
+    )
+    # 종목별로 마지막으로 거래를 마친 날의 states. 거래하지 못한 종목은 이전 값이 유지됨.
+    previous_states = np.full(len(company_codes), np.nan)
+    cash = budget
+    amounts = np.zeros(weights.shape, dtype=np.int64)
+    for row in range(len(dates)):
+        is_changed = is_tradable[row] & (rebalance | (states[row] != previous_states))
+        if not is_changed.any():
+            continue
+
+        sell_price = np.where(is_tradable[row], sell_prices[row], 0)
+        equity = cash + int(holdings @ sell_price)
+        targets = np.where(
+            is_changed,
+            np.floor(
+                weights[row] * equity / np.where(is_tradable[row], buy_prices[row], 1)
+            ),
+            holdings,
+        ).astype(np.int64)
+
+        diffs = targets - holdings
+        is_reached = diffs == 0
+        is_buy = diffs > 0
+        cash -= int(np.where(is_buy, 0, diffs) @ sell_price)
+        buy_costs = np.where(is_buy, diffs * np.nan_to_num(buy_prices[row]), 0)
+        if buy_costs.sum() > cash:
+            # 예산이 부족하면 모든 매수 수량을 같은 비율로 줄임.
+            diffs[is_buy] = np.floor(diffs[is_buy] * cash / buy_costs.sum())
+            buy_costs = np.where(is_buy, diffs * np.nan_to_num(buy_prices[row]), 0)
+        cash -= int(buy_costs.sum())
+
+        holdings += diffs
+        amounts[row] = diffs
+        # 예산이 부족해 사지 못한 종목은 다음 날 다시 시도할 수 있도록 이전 값을 유지함.
+        is_done = is_changed & (is_reached | (diffs != 0))
+        previous_states = np.where(is_done, states[row], previous_states)
+
+    rows, columns = np.nonzero(amounts)
+    trade_amounts = amounts[rows, columns]
+    # 날짜 순서대로, 같은 날에는 매도를 먼저 함.
+    order = np.lexsort((trade_amounts > 0, rows))
+    rows, columns, trade_amounts = rows[order], columns[order], trade_amounts[order]
+    return TransactionBatch.from_arrays(
+        dates.to_numpy(dtype="datetime64[ns]")[rows],
+        np.array(company_codes, dtype=str)[columns],
+        trade_amounts,
+        np.where(
+            trade_amounts > 0,
+            buy_prices[rows, columns],
+            sell_prices[rows, columns],
+        ).astype(np.int64),
+    )
+
+
+def _to_weights(signals: pd.DataFrame) -> np.ndarray:
+    if (signals.dtypes == bool).all():
+        is_held = signals.to_numpy(dtype=bool)
+        counts = is_held.sum(axis=1, keepdims=True)
+        return np.divide(is_held, counts, out=np.zeros(is_held.shape), where=counts > 0)
+
+    weights = np.nan_to_num(signals.to_numpy(dtype=np.float64))
+    if (weights < 0).any():
+        raise ValueError("Weights of `signals` cannot be negative.")
+    if (weights.sum(axis=1) > 1 + 1e-9).any():
+        raise ValueError("Sum of weights of `signals` in a day should be at most 1.")
+    return weights
+
+
+def _get_price_matrices(
+    price_cache: PriceCache,
+    company_codes: list[str],
+    dates: pd.DatetimeIndex,
+    price_key: str,
+    first_rows: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """dates × company_codes 모양의 기준 가격, 고가, 저가 행렬을 만듭니다. 장이 쉬는 날은 이전 거래일의 가격으로 채웁니다.
+
+    각 종목은 first_rows의 행부터만 불러오고 그 이전의 칸은 NaN으로 둡니다.
+    """
+    price_keys = {
+        "base": price_key,
+        "high": SIGNIFICANT_PRICE_NAMES["high"],
+        "low": SIGNIFICANT_PRICE_NAMES["low"],
+    }
+    matrices = {
+        name: np.full((len(dates), len(company_codes)), np.nan) for name in price_keys
+    }
+    if dates.empty:
+        return matrices
+
+    end_day = dates.max().to_pydatetime() + timedelta(1)
+    for column, company_code in enumerate(company_codes):
+        first_row = int(first_rows[column])
+        if first_row >= len(dates):
+            continue
+        start_day = dates[first_row:].min().to_pydatetime() - timedelta(LOOKBACK_DAYS)
+        prices = price_cache.get_prices_between_range(start_day, end_day, company_code)
+        if prices.empty:
+            continue
+        price_dates = pd.DatetimeIndex(
+            pd.to_datetime(prices["stck_bsop_date"], format=DATE_FORMAT)
+        )
+        is_needed = np.arange(len(dates)) >= first_row
+        for name, key in price_keys.items():
+            matrices[name][is_needed, column] = (
+                pd.Series(pd.to_numeric(prices[key]).to_numpy(), index=price_dates)
+                .reindex(price_dates.union(dates))
+                .ffill()
+                .reindex(dates)
+                .to_numpy(dtype=np.float64)
+            )[is_needed]
+    return matrices
+
+
+def _adjust_prices(prices: np.ndarray, mode: Literal["floor", "ceil"]) -> np.ndarray:
+    """NaN을 유지하면서 가격을 호가 단위에 맞춥니다."""
+    is_valid = ~np.isnan(prices)
+    rounded = np.floor(prices) if mode == "floor" else np.ceil(prices)
+    adjusted = np.full(prices.shape, np.nan)
+    adjusted[is_valid] = adjust_price_units(rounded[is_valid], mode)
+    return adjusted
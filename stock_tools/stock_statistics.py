@@ -6,12 +6,16 @@ import statistics
 import mojito
 import pandas as pd
 
+from .backtest_result import BacktestResult
 from .fetch import fetch_prices_by_datetime
 from .transaction_and_state import State, SIGNIFICANT_PRICE_NAMES
 
 
-def MDD(states: list[State] | pd.DataFrame) -> float:
-    states = pd.DataFrame(states) if isinstance(states, list) else states
+def MDD(states: list[State] | BacktestResult | pd.DataFrame) -> float:
+    if isinstance(states, list):
+        states = pd.DataFrame(states)
+    elif isinstance(states, BacktestResult):
+        states = states.to_pandas()
     total_appraisement = states["total_appraisement"]
     max_appraisement = total_appraisement.max()
     min_appraisement = total_appraisement.min()
@@ -25,8 +29,11 @@ def MDD(states: list[State] | pd.DataFrame) -> float:
     return (max_appraisement - min_appraisement) / max_appraisement
 
 
-def CAGR(states: list[State] | pd.DataFrame) -> float:
+def CAGR(states: list[State] | BacktestResult | pd.DataFrame) -> float:
     """1년은 윤년과는 상관없이 356일로 계산합니다."""
+    if isinstance(states, BacktestResult):
+        states = states.to_pandas()
+
     if isinstance(states, list):
         first_day = states[0]
         last_day = states[-1]
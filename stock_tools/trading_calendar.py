@@ -0,0 +1,90 @@
+"""주말과 알려진 휴장일을 제외한 거래일을 계산합니다.
+
+매년 날짜가 같은 공휴일과 연말 휴장일은 자동으로 휴장일로 취급합니다.
+설날, 추석, 대체공휴일, 임시공휴일처럼 해마다 날짜가 바뀌는 휴장일은 add_holidays로 추가할 수 있습니다.
+휴장일을 모르더라도 거래일을 실제보다 많게 셀 뿐이므로 계산 결과는 안전합니다.
+"""
+
+from __future__ import annotations
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+# 매년 같은 날짜에 쉬는 공휴일(신정, 삼일절, 근로자의 날, 어린이날, 현충일, 광복절, 개천절, 한글날, 성탄절)과 연말 휴장일
+FIXED_HOLIDAYS = (
+    "01-01",
+    "03-01",
+    "05-01",
+    "05-05",
+    "06-06",
+    "08-15",
+    "10-03",
+    "10-09",
+    "12-25",
+    "12-31",
+)
+# 해마다 날짜가 바뀌는 휴장일. add_holidays로 추가함.
+HOLIDAYS: set[date] = set()
+
+
+def add_holidays(holidays: Iterable[date | datetime]) -> None:
+    """설날, 추석, 대체공휴일 등 해마다 날짜가 바뀌는 휴장일을 추가합니다."""
+    HOLIDAYS.update(
+        holiday.date() if isinstance(holiday, datetime) else holiday
+        for holiday in holidays
+    )
+
+
+def _get_holidays(start_day: datetime, end_day: datetime) -> np.ndarray:
+    years = range(start_day.year, end_day.year + 2)
+    return np.array(
+        [f"{year}-{month_day}" for year in years for month_day in FIXED_HOLIDAYS]
+        + [holiday.isoformat() for holiday in HOLIDAYS],
+        dtype="datetime64[D]",
+    )
+
+
+def count_trading_days(start_day: datetime, end_day: datetime) -> int:
+    """start_day부터 end_day 전날까지의 거래일 수를 셉니다."""
+    if end_day <= start_day:
+        return 0
+    return int(
+        np.busday_count(
+            np.datetime64(start_day.date()),
+            np.datetime64(end_day.date()),
+            holidays=_get_holidays(start_day, end_day),
+        )
+    )
+
+
+def add_trading_days(day: datetime, trading_days: int) -> datetime:
+    """day부터 trading_days개의 거래일을 포함하는 기간의 다음 날(기간의 끝, 당일 미포함)을 반환합니다.
+
+    예를 들어 day가 금요일이고 trading_days가 1이라면 토요일을 반환합니다.
+    """
+    if trading_days <= 0:
+        return day
+    # 1년에 거래일은 최소 240일 정도이므로 넉넉하게 휴장일을 계산함.
+    holidays = _get_holidays(
+        day, day.replace(year=day.year + trading_days // 240 + 1, month=1, day=1)
+    )
+    last_trading_day = np.busday_offset(
+        np.datetime64(day.date()), trading_days - 1, roll="forward", holidays=holidays
+    )
+    return datetime.combine((last_trading_day + 1).astype(date), datetime.min.time())
+
+
+def get_trading_days(start_day: datetime, end_day: datetime) -> np.ndarray:
+    """start_day부터 end_day 전날까지의 거래일들을 datetime64[D] 배열로 반환합니다."""
+    days = np.arange(
+        np.datetime64(start_day.date()),
+        np.datetime64(end_day.date()),
+        dtype="datetime64[D]",
+    )
+    return days[np.is_busday(days, holidays=_get_holidays(start_day, end_day))]
+
+
+def first_trading_day_since(day: datetime) -> datetime:
+    """day 당일이나 그 이후의 첫 거래일을 반환합니다."""
+    return add_trading_days(day, 1) - timedelta(1)
@@ -2,24 +2,26 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Literal, Annotated
 from dataclasses import dataclass
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+import heapq
 import logging
 
 import numpy as np
+import pandas as pd
 
-from .price_cache import PriceCache
+from .price_cache import MAX_DATE_LIMIT, PriceCache
+from .price_matrix import LOOKBACK_DAYS, PriceMatrix
+from .profiling import DISABLED_PROFILER, Profiler
 from .adjust_price import adjust_price_unit
-from .exceptions import InvalidPriceError
-from .fetch import PriceDict
+from .exceptions import (
+    InvalidPriceError,
+    MojitoInvalidResponseError,
+    NoTransactionError,
+)
+from .fetch import DATE_FORMAT, SIGNIFICANT_PRICE_NAMES, PriceDict
 
-SIGNIFICANT_PRICE_NAMES = {
-    "low": "stck_lwpr",
-    "high": "stck_hgpr",
-    "open": "stck_oprc",
-    "close": "stck_clpr",
-}
 
-
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     """
     한 매수/매도 거래를 나타내는 dataclass입니다.
@@ -60,6 +62,7 @@ class Transaction:
         if isinstance(self.sell_price, str):
             # 주식 시장에서 온 값은 항상 다양한 주가 정책을 만족하기 때문에 다른 검사가 필요하지 않다.
             self.sell_price = int(price[SIGNIFICANT_PRICE_NAMES[self.sell_price]])
+            self._is_sell_price_evaluated = True
             return
 
         # numpy의 int64는 int의 subclass가 아니기에 각종 assertion에서 별별 오류를 다 만들어 냄.
@@ -80,15 +83,218 @@ class Transaction:
             self.sell_price = adjust_price_unit(
                 self.sell_price, alert=alert, **adjust_price_unit_kwargs
             )
-        self.is_sell_price_evaluated = True
+        self._is_sell_price_evaluated = True
         return
 
 
 @dataclass
+class TransactionBatch:
+    """여러 Transaction을 열(column)별 numpy 배열로 저장하는 dataclass입니다.
+
+    Transaction을 하나씩 만들지 않고도 emulate_trade에 넘길 수 있고, 모든 sell_price를 한 번에 계산하고 검사합니다.
+    각 배열의 의미는 다음과 같습니다:
+        dates: 거래가 이루어진 날짜입니다. (datetime64[ns])
+        company_codes: 종목 코드입니다.
+        amounts: 거래를 한 양입니다. 양수일 경우 매수, 음수일 경우 매도입니다.
+        sell_prices: 직접 설정한 가격입니다. sell_price_types가 빈 문자열인 거래에서만 사용됩니다.
+        sell_price_types: 'low', 'high', 'open', 'close' 중 하나이거나 직접 설정한 가격이라면 빈 문자열입니다.
+        is_evaluated: evaluate_sell_prices로 모든 sell_price가 계산되었는지를 나타냅니다.
+    """
+
+    dates: np.ndarray
+    company_codes: np.ndarray
+    amounts: np.ndarray
+    sell_prices: np.ndarray
+    sell_price_types: np.ndarray
+    is_evaluated: bool = False
+
+    @classmethod
+    def from_arrays(
+        cls,
+        dates: Sequence[datetime] | np.ndarray,
+        company_codes: Sequence[str] | np.ndarray,
+        amounts: Sequence[int] | np.ndarray,
+        sell_prices: Sequence[Literal["low", "high", "open", "close"] | int]
+        | np.ndarray
+        | Literal["low", "high", "open", "close"],
+    ) -> TransactionBatch:
+        """배열들로 TransactionBatch를 만듭니다. sell_prices에 'close'와 같은 문자열 하나를 넣으면 모든 거래에 적용됩니다."""
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        if isinstance(sell_prices, str):
+            sell_prices = np.full(len(dates), sell_prices)
+        sell_prices = np.asarray(sell_prices)
+
+        if sell_prices.dtype.kind in "iuf":
+            sell_price_types = np.full(len(dates), "")
+            manual_sell_prices = sell_prices.astype(np.int64)
+        else:
+            sell_prices = sell_prices.astype(str)
+            is_manual = ~np.isin(sell_prices, list(SIGNIFICANT_PRICE_NAMES))
+            sell_price_types = np.where(is_manual, "", sell_prices)
+            manual_sell_prices = np.where(is_manual, sell_prices, "0").astype(np.int64)
+
+        return cls(
+            dates,
+            np.asarray(company_codes, dtype=str),
+            np.asarray(amounts, dtype=np.int64),
+            manual_sell_prices,
+            sell_price_types,
+        )
+
+    @classmethod
+    def from_transactions(cls, transactions: Sequence[Transaction]) -> TransactionBatch:
+        return cls.from_arrays(
+            [transaction.date for transaction in transactions],
+            [transaction.company_code for transaction in transactions],
+            [transaction.amount for transaction in transactions],
+            np.array(
+                [transaction.sell_price for transaction in transactions], dtype=object
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def evaluate_sell_prices(self, price_cache: PriceCache) -> TransactionBatch:
+        """모든 sell_price를 정수 가격으로 계산한 새 TransactionBatch를 반환합니다.
+
+        Transaction.evaluate_sell_price와 같이 해당 날짜(혹은 가장 가까운 과거)의 가격을 사용하며,
+        직접 설정한 가격이 저가보다 낮거나 고가보다 높은 거래가 하나라도 있다면 `InvalidPriceError`를 냅니다.
+        """
+        if self.is_evaluated:
+            return self
+
+        daily_prices = self._get_daily_prices(price_cache)
+        sell_prices = self.sell_prices.copy()
+        for price_name, price_key in SIGNIFICANT_PRICE_NAMES.items():
+            is_price_name = self.sell_price_types == price_name
+            sell_prices[is_price_name] = daily_prices[price_key][is_price_name]
+
+        lows = daily_prices[SIGNIFICANT_PRICE_NAMES["low"]]
+        highs = daily_prices[SIGNIFICANT_PRICE_NAMES["high"]]
+        is_invalid = (self.sell_price_types == "") & (
+            (sell_prices < lows) | (highs < sell_prices)
+        )
+        if is_invalid.any():
+            index = int(np.flatnonzero(is_invalid)[0])
+            raise InvalidPriceError(
+                "Manual sell_price should be lower then or equal to highest price and greater then or equal to lowest price in daily. "
+                f"{is_invalid.sum()} transaction(s) are invalid. First invalid transaction: "
+                f"index: {index}, date: {self.dates[index]}, company_code: {self.company_codes[index]}, "
+                f"sell_price: {sell_prices[index]}, highest price: {highs[index]}, lowest price: {lows[index]}"
+            )
+
+        return TransactionBatch(
+            self.dates,
+            self.company_codes,
+            self.amounts,
+            sell_prices,
+            np.full(len(self), ""),
+            is_evaluated=True,
+        )
+
+    def _get_daily_prices(self, price_cache: PriceCache) -> dict[str, np.ndarray]:
+        """각 거래 날짜(혹은 가장 가까운 과거)의 저가/고가/시가/종가를 거래 순서대로 가져옵니다."""
+        daily_prices = {
+            price_key: np.zeros(len(self), dtype=np.int64)
+            for price_key in SIGNIFICANT_PRICE_NAMES.values()
+        }
+        for company_code in np.unique(self.company_codes):
+            positions = np.flatnonzero(self.company_codes == company_code)
+            dates = self.dates[positions]
+            start_day = pd.Timestamp(dates.min()).to_pydatetime()
+            end_day = pd.Timestamp(dates.max()).to_pydatetime()
+            prices = price_cache.get_prices_between_range(
+                start_day - timedelta(LOOKBACK_DAYS),
+                end_day + timedelta(1),
+                company_code,
+            )
+            price_dates = pd.to_datetime(
+                prices["stck_bsop_date"], format=DATE_FORMAT
+            ).to_numpy(dtype="datetime64[ns]")
+
+            rows = np.searchsorted(price_dates, dates, side="right") - 1
+            # 상장 전이나 상장 폐지 후처럼 불러온 가격이 없다면 모든 거래를 get_price로 처리함.
+            is_found = (
+                (0 <= rows)
+                & (
+                    dates - price_dates[np.maximum(rows, 0)]
+                    <= np.timedelta64(MAX_DATE_LIMIT, "D")
+                )
+                if len(price_dates)
+                else np.zeros(len(positions), dtype=bool)
+            )
+            for price_key, values in daily_prices.items():
+                column = pd.to_numeric(prices[price_key]).to_numpy(dtype=np.int64)
+                values[positions[is_found]] = column[rows[is_found]]
+
+            # 불러온 기간보다 더 과거의 가격이 필요한 경우 기존처럼 get_price를 사용함.
+            for position in positions[~is_found]:
+                day = pd.Timestamp(self.dates[position]).to_pydatetime()
+                try:
+                    price = price_cache.get_price(day, company_code, None, "past")
+                except MojitoInvalidResponseError as error:
+                    raise NoTransactionError(
+                        f"There's no price of {company_code} on or before {day}."
+                    ) from error
+                for price_key, values in daily_prices.items():
+                    values[position] = int(price[price_key])
+
+        return daily_prices
+
+    def to_transaction_rows(self) -> list[tuple]:
+        """Transaction의 field 순서를 따르는 tuple들의 list를 반환합니다. Transaction(*row)로 Transaction을 만들 수 있습니다."""
+        sell_prices = [
+            sell_price_type or sell_price
+            for sell_price_type, sell_price in zip(
+                self.sell_price_types.tolist(), self.sell_prices.tolist()
+            )
+        ]
+        return list(
+            zip(
+                self.dates.astype("datetime64[us]").tolist(),
+                self.company_codes.tolist(),
+                self.amounts.tolist(),
+                sell_prices,
+                [self.is_evaluated] * len(self),
+            )
+        )
+
+
+def merge_transaction_streams(
+    streams: Mapping[str, Iterable[Transaction]],
+) -> Iterator[tuple[str, Transaction]]:
+    """전략별로 날짜 순서대로 정렬된 transaction들을 heap으로 합쳐 (전략 이름, Transaction)을 날짜 순서대로 반환합니다.
+
+    각 stream에서 한 번에 하나씩만 꺼내기 때문에 stream들을 미리 list로 만들거나 다시 정렬할 필요가 없습니다.
+    날짜가 같다면 streams의 순서를 따르며, 정렬되지 않은 stream이 있다면 ValueError를 냅니다.
+    """
+
+    def tag(
+        strategy: str, stream: Iterable[Transaction]
+    ) -> Iterator[tuple[str, Transaction]]:
+        previous_date: datetime | None = None
+        for transaction in stream:
+            if previous_date is not None and transaction.date < previous_date:
+                raise ValueError(
+                    f"Transactions of strategy '{strategy}' are not sorted by date. "
+                    f"{transaction} comes after {previous_date}."
+                )
+            previous_date = transaction.date
+            yield strategy, transaction
+
+    return heapq.merge(
+        *(tag(strategy, stream) for strategy, stream in streams.items()),
+        key=lambda item: item[1].date,
+    )
+
+
+@dataclass(slots=True)
 class State:
     """해당 날짜나 거래 후의 상태를 나타내는 dataclass입니다.
 
     stocks의 count는 음수가 될 수 **없습니다.**
+    strategy_pnls는 emulate_trade에서 attribute_strategies가 True일 때만 계산되는 전략별 누적 손익입니다.
     """
 
     date: datetime
@@ -96,6 +302,7 @@ class State:
     budget: int
     stocks: dict[str, tuple[Annotated[int, "count"], Annotated[int, "price"]]]
     transaction: Transaction | None
+    strategy_pnls: dict[str, int] | None = None
 
     @classmethod
     def from_previous_state(
@@ -109,6 +316,8 @@ class State:
             Annotated[float, "buy_commission"], Annotated[float, "sell_commission"]
         ]
         | None = None,
+        price_matrix: PriceMatrix | None = None,
+        profiler: Profiler = DISABLED_PROFILER,
     ) -> State:
         """몇 가지 정보를 주면 total_appraisement나 stocks을 계산해 주는 constructor입니다.
 
@@ -117,6 +326,9 @@ class State:
         [이 글](https://stockplus.com/m/investing_strategies/articles/1620?scope=all)에 따르면
         일반적인 매수 수수료는 0.015%, 매도 시에는 수수료와 세금을 합쳐 코스피 기준 0.3015%입니다.
         이 경우 commission을 `(0.00015, 0.003015)`으로 설정할 수 있습니다.
+
+        price_matrix가 주어지면 보유 주식의 종가를 price_cache 대신 price_matrix에서 한 번에 가져옵니다.
+        profiler가 주어지면 sell_price 계산과 평가액 계산에 걸린 시간을 측정합니다.
         """
         if privous_state is None:
             budget = 0
@@ -127,11 +339,13 @@ class State:
             stocks = privous_state.stocks
             transaction_company = None
         else:
-            evaluated_price = price_cache.get_price(
-                date, transaction.company_code, None, "past"
-            )
-
-            transaction.evaluate_sell_price(evaluated_price)
+            if not transaction._is_sell_price_evaluated:
+                with profiler.phase("state.sell_price", date):
+                    transaction.evaluate_sell_price(
+                        price_cache.get_price(
+                            date, transaction.company_code, None, "past"
+                        )
+                    )
             assert isinstance(
                 transaction.sell_price, int
             ), "Evaluate_sell_price didn't work well."
@@ -173,9 +387,18 @@ class State:
             )
             transaction_company = transaction.company_code
 
-        new_stocks, stock_appraisement = cls._evaluate_new_stock_prices(
-            date, stocks, transaction_company, price_cache
-        )
+        with profiler.phase("state.evaluate_prices", date):
+            if price_matrix is None:
+                new_stocks, stock_appraisement = cls._evaluate_new_stock_prices(
+                    date, stocks, transaction_company, price_cache
+                )
+            else:
+                (
+                    new_stocks,
+                    stock_appraisement,
+                ) = cls._evaluate_new_stock_prices_by_matrix(
+                    date, stocks, transaction_company, price_cache, price_matrix
+                )
 
         return cls(
             date,
@@ -214,5 +437,37 @@ class State:
 
         return new_stocks, stock_appraisement
 
+    @classmethod
+    def _evaluate_new_stock_prices_by_matrix(
+        cls,
+        date: datetime,
+        stocks: dict[str, tuple[int, int]],
+        transaction_company: str | None,
+        price_cache: PriceCache,
+        price_matrix: PriceMatrix,
+    ) -> tuple[dict[str, tuple[int, int]], int]:
+        """_evaluate_new_stock_prices와 같지만 종가를 price_matrix에서 한 번에 가져와 내적으로 평가액을 계산합니다."""
+        company_codes = list(stocks)
+        counts = np.fromiter(
+            (count for count, _ in stocks.values()), dtype=np.int64, count=len(stocks)
+        )
+        closes = price_matrix.get_closes(date, company_codes)
+        if transaction_company in stocks:
+            closes[company_codes.index(transaction_company)] = stocks[
+                transaction_company
+            ][1]
+
+        for index in np.flatnonzero(np.isnan(closes)):
+            # 행렬에 없는 날짜나 종목은 기존처럼 price_cache에서 가져옴.
+            closes[index] = int(
+                price_cache.get_price(date, company_codes[index], None, "past")[
+                    SIGNIFICANT_PRICE_NAMES["close"]
+                ]
+            )
+
+        prices = closes.astype(np.int64)
+        new_stocks = dict(zip(company_codes, zip(counts.tolist(), prices.tolist())))
+        return new_stocks, int(counts @ prices)
+
 
 INITIAL_STATE = State(datetime(1900, 1, 1), 0, 0, {}, None)
@@ -0,0 +1,104 @@
+"""emulate_trade에서 사용하는 손절/익절/추적 손절/기간 청산 규칙입니다.
+
+각 규칙은 마지막 거래 이후의 주식 평가액 경로 전체를 받아 규칙이 발동되는 날들을 배열로 계산합니다.
+emulate_trade는 여러 규칙의 결과를 합쳐 가장 먼저 발동되는 날에 다음 transaction을 그 날의 종가로 앞당깁니다.
+이 방식은 panic_sell_rate와 같으며, 따라서 transaction은 전부 사거나 파는 시그널 방식이어야 합니다.
+"""
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Trigger(ABC):
+    """모든 규칙의 base class입니다."""
+
+    @abstractmethod
+    def breaches(
+        self,
+        appraisements: np.ndarray,
+        base_appraisement: float,
+        days_held: np.ndarray,
+    ) -> np.ndarray:
+        """규칙이 발동되는 날이 True인 bool 배열을 반환합니다.
+
+        Args:
+            appraisements: 마지막 거래 다음 날부터의 날짜별 주식 평가액입니다.
+            base_appraisement: 마지막 거래 직후의 주식 평가액입니다.
+            days_held: appraisements의 각 날짜가 마지막 거래로부터 며칠 지났는지를 나타냅니다.
+        """
+
+
+@dataclass(frozen=True)
+class StopLoss(Trigger):
+    """평가액이 마지막 거래 직후보다 rate 이상 떨어지면 발동합니다. panic_sell_rate와 같습니다."""
+
+    rate: float
+
+    def breaches(self, appraisements, base_appraisement, days_held):
+        return _change_rates(appraisements, base_appraisement) <= -self.rate
+
+
+@dataclass(frozen=True)
+class TakeProfit(Trigger):
+    """평가액이 마지막 거래 직후보다 rate 이상 오르면 발동합니다."""
+
+    rate: float
+
+    def breaches(self, appraisements, base_appraisement, days_held):
+        return _change_rates(appraisements, base_appraisement) >= self.rate
+
+
+@dataclass(frozen=True)
+class TrailingStop(Trigger):
+    """평가액이 마지막 거래 이후의 최고 평가액보다 rate 이상 떨어지면 발동합니다."""
+
+    rate: float
+
+    def breaches(self, appraisements, base_appraisement, days_held):
+        highest_appraisements = np.maximum.accumulate(
+            np.maximum(appraisements, base_appraisement)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = (appraisements - highest_appraisements) / highest_appraisements
+        return drawdowns <= -self.rate
+
+
+@dataclass(frozen=True)
+class TimeStop(Trigger):
+    """마지막 거래로부터 days일 이상 지나면 발동합니다."""
+
+    days: int
+
+    def breaches(self, appraisements, base_appraisement, days_held):
+        return days_held >= self.days
+
+
+def find_first_breach(
+    triggers: list[Trigger],
+    appraisements: np.ndarray,
+    base_appraisement: float,
+    days_held: np.ndarray,
+) -> int | None:
+    """triggers 중 하나라도 발동되는 첫 번째 날의 index를 반환합니다. 발동되지 않는다면 None을 반환합니다."""
+    if not triggers or not len(appraisements):
+        return None
+
+    breached = np.logical_or.reduce(
+        [
+            trigger.breaches(appraisements, base_appraisement, days_held)
+            for trigger in triggers
+        ]
+    )
+    first_breach = int(np.argmax(breached))
+    return first_breach if breached[first_breach] else None
+
+
+def _change_rates(appraisements: np.ndarray, base_appraisement: float) -> np.ndarray:
+    # _calculate_appraisement_diff_rate와 같이 값이 같다면 변화율을 0으로 취급함.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = (appraisements - base_appraisement) / base_appraisement
+    return np.where(appraisements == base_appraisement, 0.0, rates)
@@ -0,0 +1,66 @@
+"""API를 호출하지 않고 정해진 가격을 돌려주는 broker로 PriceCache를 만드는 fixture들입니다."""
+
+from __future__ import annotations
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("mojito")
+
+from stock_tools import PriceCache
+from stock_tools.fetch import DATE_FORMAT
+
+# (종목 코드, 날짜) -> 종가. None이라면 그 날은 거래되지 않음.
+PriceFunction = Callable[[str, datetime], "int | None"]
+
+
+def weekday_price(company_code: str, date: datetime) -> int | None:
+    return 10000 if date.weekday() < 5 else None
+
+
+class FakeBroker:
+    """fetch_ohlcv만 구현한 broker입니다. 가격은 price_function이 정하며, 요청은 calls에 기록됩니다."""
+
+    def __init__(self, price_function: PriceFunction = weekday_price) -> None:
+        self.price_function = price_function
+        self.calls: list[tuple[str, str, str, str]] = []
+
+    def fetch_ohlcv(self, company_code, date_type, start_day, end_day):
+        self.calls.append((company_code, date_type, start_day, end_day))
+        rows = []
+        date = datetime.strptime(end_day, DATE_FORMAT)
+        while date >= datetime.strptime(start_day, DATE_FORMAT):
+            close = self.price_function(company_code, date)
+            if close is not None:
+                rows.append(
+                    {
+                        "stck_bsop_date": date.strftime(DATE_FORMAT),
+                        "stck_clpr": str(close),
+                        "stck_oprc": str(close),
+                        "stck_hgpr": str(close),
+                        "stck_lwpr": str(close),
+                        "acml_vol": "1000",
+                        "acml_tr_pbmn": str(close * 1000),
+                        "flng_cls_code": "00",
+                        "prtt_rate": "0.00",
+                        "mod_yn": "N",
+                        "prdy_vrss_sign": "3",
+                        "prdy_vrss": "0",
+                        "revl_issu_reas": "",
+                    }
+                )
+            date -= timedelta(1)
+        return {"output2": rows or [{}]}
+
+
+@pytest.fixture
+def make_price_cache(monkeypatch, tmp_path) -> Callable[..., PriceCache]:
+    """캐시 파일을 사용하지 않는 PriceCache를 만드는 함수를 반환합니다."""
+    monkeypatch.setattr(PriceCache, "cache_prices", False)
+    monkeypatch.setattr(PriceCache, "cache_directory", tmp_path)
+
+    def make(price_function: PriceFunction = weekday_price) -> PriceCache:
+        return PriceCache(FakeBroker(price_function))
+
+    return make
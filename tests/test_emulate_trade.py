@@ -0,0 +1,131 @@
+from __future__ import annotations
+from dataclasses import astuple
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from stock_tools import (
+    INITIAL_STATE,
+    EmulationCheckpoint,
+    PriceMatrix,
+    StopLoss,
+    Transaction,
+    emulate_trade,
+)
+from stock_tools.emulate_trade import _get_holding_spans
+
+
+def falling_price(company_code: str, date: datetime) -> int | None:
+    """005930은 1월 27일에 6%, 2월 1일에 다시 떨어지고 000660은 가격이 변하지 않습니다."""
+    if date.weekday() >= 5:
+        return None
+    if company_code == "000660":
+        return 10000
+    if date < datetime(2023, 1, 27):
+        return 10000
+    if date < datetime(2023, 2, 1):
+        return 9400
+    return 8000
+
+
+# 1월 27일의 하락으로 000660의 매수가 원래 날짜(2월 6일)보다 앞당겨지고,
+# 2월 1일의 하락으로 005930의 매도가 다시 앞당겨져야 함.
+TRANSACTIONS = [
+    Transaction(datetime(2023, 1, 2), "005930", 10, "close"),
+    Transaction(datetime(2023, 2, 6), "000660", 1, "close"),
+    Transaction(datetime(2023, 2, 7), "005930", -10, "close"),
+    Transaction(datetime(2023, 2, 20), "000660", -1, "close"),
+]
+
+
+def _summarize(states):
+    return [(state.date, state.total_appraisement, state.budget) for state in states]
+
+
+def test_advanced_buy_is_valued_before_its_original_date(make_price_cache):
+    price_cache = make_price_cache(falling_price)
+    states, _, transactions_df = emulate_trade(
+        price_cache, TRANSACTIONS, panic_sell_rate=0.05
+    )
+    assert transactions_df["date"].tolist()[:3] == [
+        datetime(2023, 1, 2),
+        datetime(2023, 1, 27),
+        datetime(2023, 2, 1),
+    ]
+
+    rows = [astuple(transaction) for transaction in TRANSACTIONS]
+    start_day, end_day = datetime(2023, 1, 2), datetime(2023, 2, 20)
+    price_matrix = PriceMatrix.from_price_cache(
+        price_cache,
+        ["005930", "000660"],
+        start_day,
+        end_day,
+        _get_holding_spans(INITIAL_STATE, rows, start_day, end_day),
+    )
+    closes = price_matrix.get_closes_between(
+        datetime(2023, 1, 27), datetime(2023, 2, 3), ["005930", "000660"]
+    )
+    assert not np.isnan(closes).any()
+
+
+def test_stop_loss_trigger_matches_panic_sell_rate(make_price_cache):
+    price_cache = make_price_cache(falling_price)
+    panic_states, _, _ = emulate_trade(price_cache, TRANSACTIONS, panic_sell_rate=0.05)
+    trigger_states = emulate_trade(price_cache, TRANSACTIONS, triggers=[StopLoss(0.05)])
+    sells = [
+        state
+        for state in trigger_states
+        if state.transaction is not None and state.transaction.amount < 0
+    ]
+    assert sells[0].date == datetime(2023, 2, 1)
+    assert _summarize(trigger_states) == _summarize(panic_states)
+
+
+def test_triggers_need_every_day(make_price_cache):
+    with pytest.raises(ValueError):
+        emulate_trade(
+            make_price_cache(),
+            TRANSACTIONS,
+            only_if_transaction_exists=True,
+            triggers=[StopLoss(0.05)],
+        )
+
+
+def test_resume_merges_new_transactions_before_pending_ones(make_price_cache):
+    price_cache = make_price_cache(falling_price)
+    first = [
+        Transaction(datetime(2023, 1, 2), "005930", 10, "close"),
+        Transaction(datetime(2023, 3, 2), "005930", -10, "close"),
+    ]
+    # 아직 처리되지 않은 3월 2일의 매도보다 앞선 거래들. 1월 27일의 panic sell은 이 중 첫 거래를 앞당겨야 함.
+    second = [
+        Transaction(datetime(2023, 2, 6), "000660", 1, "close"),
+        Transaction(datetime(2023, 2, 20), "000660", -1, "close"),
+    ]
+    last_date, final_date = datetime(2023, 1, 20), datetime(2023, 3, 10)
+    checkpoint = EmulationCheckpoint()
+    emulate_trade(
+        price_cache,
+        first,
+        final_date=last_date,
+        panic_sell_rate=0.05,
+        checkpoint=checkpoint,
+    )
+    resumed, _, _ = emulate_trade(
+        price_cache,
+        second,
+        final_date=final_date,
+        panic_sell_rate=0.05,
+        checkpoint=checkpoint,
+    )
+
+    full, _, _ = emulate_trade(
+        price_cache,
+        sorted([*first, *second], key=lambda transaction: transaction.date),
+        final_date=final_date,
+        panic_sell_rate=0.05,
+    )
+    assert _summarize(resumed[1:]) == _summarize(
+        [state for state in full if state.date > last_date]
+    )
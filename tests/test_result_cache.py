@@ -0,0 +1,44 @@
+from __future__ import annotations
+from datetime import datetime
+
+from stock_tools import EmulationResultCache, Transaction, TransactionBatch
+
+
+def _make_key(result_cache, price_cache, transactions):
+    return result_cache.make_key(
+        price_cache, transactions, None, None, False, None, None, True, None
+    )
+
+
+def test_batch_key_does_not_change_after_evaluation(make_price_cache, tmp_path):
+    price_cache = make_price_cache()
+    result_cache = EmulationResultCache(tmp_path / "results")
+    batch = TransactionBatch.from_transactions(
+        [
+            Transaction(datetime(2023, 1, 2), "005930", 10, "close"),
+            Transaction(datetime(2023, 1, 9), "005930", -10, 10000),
+        ]
+    )
+
+    key = _make_key(result_cache, price_cache, batch)
+    assert key is not None
+    assert (
+        _make_key(result_cache, price_cache, batch.evaluate_sell_prices(price_cache))
+        == key
+    )
+
+
+def test_batch_key_depends_only_on_evaluated_prices(make_price_cache, tmp_path):
+    price_cache = make_price_cache()
+    result_cache = EmulationResultCache(tmp_path / "results")
+    keys = [
+        _make_key(
+            result_cache,
+            price_cache,
+            TransactionBatch.from_transactions(
+                [Transaction(datetime(2023, 1, 2), "005930", amount, sell_price)]
+            ),
+        )
+        for amount, sell_price in ((10, "close"), (10, 10000), (11, "close"))
+    ]
+    assert keys[0] == keys[1] != keys[2]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from stock_tools import screen_universe
+
+CODES = ["005930", "000660"]
+# 설날 연휴는 달력에 없으므로 거래일로 취급되지만 데이터가 없음.
+HOLIDAYS = {datetime(2023, 1, 23), datetime(2023, 1, 24)}
+SUSPENDED = ("000660", datetime(2023, 2, 8))
+
+
+def holiday_price(company_code: str, date: datetime) -> int | None:
+    if date.weekday() >= 5 or date in HOLIDAYS or (company_code, date) == SUSPENDED:
+        return None
+    return 10000 + (date.toordinal() * (7 if company_code == "005930" else 3)) % 50 * 10
+
+
+def _expected_features(
+    company_code: str, start_day: datetime, end_day: datetime, days: int
+) -> pd.DataFrame:
+    """실제로 거래된 날만으로 계산한 지표입니다. 모든 거래량은 같으므로 volume_surge는 1입니다."""
+    dates = [start_day - timedelta(60) + timedelta(offset) for offset in range(60 + 60)]
+    closes = pd.Series(
+        {
+            date: float(price)
+            for date in dates
+            if (price := holiday_price(company_code, date)) is not None
+        }
+    )
+    log_returns = np.log(closes / closes.shift(1))
+    expected = pd.DataFrame(
+        {
+            "return": closes / closes.shift(days) - 1,
+            "volatility": log_returns.rolling(days).std(),
+            "volume_surge": 1.0,
+        }
+    )
+    return expected[(expected.index >= start_day) & (expected.index < end_day)]
+
+
+def test_missing_rows_do_not_break_features(make_price_cache):
+    price_cache = make_price_cache(holiday_price)
+    start_day, end_day = datetime(2023, 1, 20), datetime(2023, 2, 15)
+    rankings = screen_universe(
+        price_cache,
+        CODES,
+        start_day,
+        end_day,
+        top_k=len(CODES),
+        features=["return", "volatility", "volume_surge"],
+        return_days=5,
+        volatility_days=5,
+        volume_days=5,
+    )
+
+    # 휴장일과 거래 정지일에는 순위가 없음.
+    assert not rankings["date"].isin(list(HOLIDAYS)).any()
+    suspended = rankings[
+        (rankings["company_code"] == SUSPENDED[0]) & (rankings["date"] == SUSPENDED[1])
+    ]
+    assert suspended.empty
+
+    for company_code in CODES:
+        expected = _expected_features(company_code, start_day, end_day, 5)
+        actual = rankings[rankings["company_code"] == company_code].pivot(
+            index="date", columns="feature", values="value"
+        )
+        # 빈 행 직후에도 모든 지표가 계산되어야 함.
+        assert list(actual.index) == list(expected.index)
+        np.testing.assert_allclose(
+            actual[expected.columns].to_numpy(), expected.to_numpy()
+        )